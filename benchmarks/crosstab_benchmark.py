@@ -0,0 +1,95 @@
+"""
+Compare the bincount crosstab kernel with the pandas groupby/pivot_table path it replaces.
+
+Usage:
+    python -m benchmarks.crosstab_benchmark --rows 10000000
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from haki_data.crosstab import crosstab, group_totals
+
+
+def make_activities(rows: int, courts: int, case_types: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build synthetic activities shaped like the transformed DCRT data.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'court': pd.Categorical.from_codes(rng.integers(0, courts, rows), [f'Court {i}' for i in range(courts)]),
+        'broad_case_type': pd.Categorical.from_codes(rng.integers(0, case_types, rows), [f'Case Type {i}' for i in range(case_types)]),
+        'productivity_category': rng.choice(np.array(['merit', 'non-merit', None], dtype=object), rows),
+        'concluded': rng.random(rows) < 0.3,
+        'adjourned': (rng.random(rows) < 0.2).astype(int),
+        'adjournable': (rng.random(rows) < 0.6).astype(int),
+    })
+
+
+def pandas_outcomes(df: pd.DataFrame) -> pd.DataFrame:
+    counts = df[df['concluded'] == 1].groupby(['court', 'broad_case_type'], observed=True).size().reset_index(name='num_cases')
+    return counts.pivot_table(index='court', columns='broad_case_type', values='num_cases', fill_value=0, observed=True)
+
+
+def kernel_outcomes(df: pd.DataFrame) -> pd.DataFrame:
+    return crosstab(df['court'], df['broad_case_type'], mask=(df['concluded'] == 1).to_numpy()).astype(float)
+
+
+def pandas_productivity(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.pivot_table(df, values='concluded', index='court', columns='productivity_category', aggfunc='count', fill_value=0, observed=True)
+
+
+def kernel_productivity(df: pd.DataFrame) -> pd.DataFrame:
+    return crosstab(df['court'], df['productivity_category'], mask=df['concluded'].notna().to_numpy())
+
+
+def pandas_adjournment(df: pd.DataFrame) -> pd.DataFrame:
+    adjourned = df.groupby('court', observed=True)['adjourned'].sum().reset_index(name='total_adjourned')
+    adjournable = df.groupby('court', observed=True)['adjournable'].sum().reset_index(name='total_adjournable')
+    return pd.merge(adjourned, adjournable, on='court')
+
+
+def kernel_adjournment(df: pd.DataFrame) -> pd.DataFrame:
+    return group_totals(df['court'], {'total_adjourned': df['adjourned'], 'total_adjournable': df['adjournable']})
+
+
+BENCHMARKS: Dict[str, Dict[str, Callable[[pd.DataFrame], pd.DataFrame]]] = {
+    'court_outcomes': {'pandas': pandas_outcomes, 'kernel': kernel_outcomes},
+    'productivity': {'pandas': pandas_productivity, 'kernel': kernel_productivity},
+    'adjournment': {'pandas': pandas_adjournment, 'kernel': kernel_adjournment},
+}
+
+
+def best_time(func: Callable[[pd.DataFrame], pd.DataFrame], df: pd.DataFrame, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crosstab kernel against pandas")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Number of synthetic activities")
+    parser.add_argument("--courts", type=int, default=120, help="Number of courts")
+    parser.add_argument("--case_types", type=int, default=40, help="Number of broad case types")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation; the best is reported")
+    args = parser.parse_args()
+
+    df = make_activities(args.rows, args.courts, args.case_types)
+    print(f"{args.rows:,} rows, {args.courts} courts, {args.case_types} case types")
+    for name, implementations in BENCHMARKS.items():
+        expected = implementations['pandas'](df)
+        result = implementations['kernel'](df)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        pandas_time = best_time(implementations['pandas'], df, args.repeat)
+        kernel_time = best_time(implementations['kernel'], df, args.repeat)
+        print(f"{name:15} pandas {pandas_time:8.3f}s  kernel {kernel_time:8.3f}s  speedup {pandas_time / kernel_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
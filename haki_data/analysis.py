@@ -1,10 +1,16 @@
 # Import files
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Union, Optional
+from typing import Dict, Any, List, Tuple, Union, Optional
 import logging
 from . logging_config import logger
 from . constants import *
+from . taxonomy import OUTCOME_FLAGS, invert_mapping, map_unique, outcome_matcher
+from . rules import col, default_engine, ref, when
+from . cube import AggregateCube
+from . crosstab import crosstab, factorize_labels, group_totals, label_table
+from . lifecycle import earliest, first_position, latest, segment_cases
+from . pmmu import case_time_limits, validate_time_limits
 
 def add_case_age(df: pd.DataFrame, filed_date_column: str = 'filed_date', activity_date_column: str = 'activity_date', age_column: str = 'case_age') -> pd.DataFrame:
     """
@@ -42,13 +48,13 @@ def add_case_age(df: pd.DataFrame, filed_date_column: str = 'filed_date', activi
 
     return df
 
-def categorize_case(case_type: str, criminal_cases: Optional[List[str]]) -> str:
+def categorize_case(case_type: str, criminal_cases: Optional[Union[List[str], frozenset]]) -> str:
     """
     Categorize a case as 'Criminal' or 'Civil' based on its type.
     
     Args:
         case_type (str): The type of the case.
-        criminal_cases (Optional[List[str]]): List of case types considered as criminal.
+        criminal_cases (Optional[Union[List[str], frozenset]]): Case types considered as criminal.
         
     Returns:
         str: 'Criminal' if the case type is in the criminal cases list or if criminal_cases is None, 'Civil' otherwise.
@@ -70,7 +76,8 @@ def add_case_nature(df: pd.DataFrame, criminal_cases: Optional[List[str]] = None
     Returns:
         pd.DataFrame: DataFrame with an added 'nature' column indicating case nature.
     """
-    df['nature'] = df['case_type'].apply(lambda x: categorize_case(x, criminal_cases))
+    criminal = frozenset(criminal_cases) if criminal_cases is not None else None
+    df['nature'] = map_unique(df['case_type'], lambda case_type: categorize_case(case_type, criminal), 'Civil', categorical=True)
 
     # Check for presence of both case types
     if 'Criminal' not in df['nature'].values:
@@ -131,22 +138,28 @@ def add_broad_category(
         logger.error(f"Column '{case_type_column}' not found in DataFrame")
         raise ValueError(f"Column '{case_type_column}' not found in the DataFrame")
     
-    # Apply the dictionary mapping using find_matching_keys function
-    df[broad_case_type_column] = df[case_type_column].apply(lambda x: find_matching_keys(x, mapping))
+    # Look each distinct case type up in the inverted mapping; ambiguous ones keep all their keys as in find_matching_keys
+    index, ambiguous = invert_mapping(mapping)
+    if ambiguous:
+        logger.warning(f"Case types listed under several categories: {ambiguous}")
+    lookup = {value: keys[0] if len(keys) == 1 else keys for value, keys in index.items()}
+    df[broad_case_type_column] = map_unique(df[case_type_column], lookup, categorical=not ambiguous)
     
     logger.info(f"Successfully mapped case types to broad categories in '{broad_case_type_column}' column.")
     return df
 
 
-def analyze_court_outcomes(df: pd.DataFrame, start_date: str, end_date: str, outcome: str) -> pd.DataFrame:
+def analyze_court_outcomes(df: pd.DataFrame, start_date: Union[str, pd.Timestamp], end_date: Union[str, pd.Timestamp], outcome: str, cube: Optional[AggregateCube] = None) -> pd.DataFrame:
     """
     Calculate the number of case outcomes per court within a specified period.
     
     Args:
         df (pd.DataFrame): A pandas DataFrame containing the data.
-        start_date (str): The starting date of the period (YYYY-MM-DD format).
-        end_date (str): The ending date of the period (YYYY-MM-DD format).
+        start_date (Union[str, pd.Timestamp]): The starting date of the period (YYYY-MM-DD format or a Timestamp).
+        end_date (Union[str, pd.Timestamp]): The ending date of the period (YYYY-MM-DD format or a Timestamp).
         outcome (str): A column representing the outcome of interest.
+        cube (Optional[AggregateCube]): Aggregates of `df`. Used instead of `df` when the period covers whole months
+            and `outcome` is one of the cube flags.
         
     Returns:
         pd.DataFrame: A DataFrame showing the number of resolved cases per court and case category.
@@ -157,34 +170,26 @@ def analyze_court_outcomes(df: pd.DataFrame, start_date: str, end_date: str, out
         
         if period_start > period_end:
             raise ValueError("start_date must be earlier than end_date")
+
+        if cube is not None and cube.holds_outcome(outcome) and cube.is_month_aligned(period_start, period_end):
+            return cube.court_outcomes(period_start, period_end, outcome)
         
         required_columns = {'court', 'broad_case_type', 'activity_date', outcome}
         if not required_columns.issubset(df.columns):
             missing_columns = required_columns - set(df.columns)
             raise KeyError(f"Missing required columns: {missing_columns}")
         
-        filtered_cases = df[
+        in_period = (
             (df['activity_date'] >= period_start) &
             (df['activity_date'] <= period_end) &
             (df[outcome] == 1)
-        ]
+        ).to_numpy()
         
-        if filtered_cases.empty:
+        if not in_period.any():
             logging.warning("No cases found for the given date range and outcome.")
-   
-        outcome_by_type = (
-            filtered_cases
-            .groupby(['court', 'broad_case_type'])
-            .size()
-            .reset_index(name='num_cases')
-        )
-
-        result = outcome_by_type.pivot_table(
-            index='court', 
-            columns='broad_case_type', 
-            values='num_cases', 
-            fill_value=0
-        )
+
+        # Counts are returned as floats, as the mean-aggregated pivot table they replace was
+        result = crosstab(df['court'], df['broad_case_type'], mask=in_period).astype(float)
         
         logging.info("Successfully calculated case outcomes per court.")
         return result
@@ -194,25 +199,119 @@ def analyze_court_outcomes(df: pd.DataFrame, start_date: str, end_date: str, out
         raise
 
 
+def analyze_court_outcomes_windows(
+    df: pd.DataFrame,
+    windows: List[Tuple[Union[str, pd.Timestamp], Union[str, pd.Timestamp]]],
+    outcome: str,
+    cube: Optional[AggregateCube] = None,
+) -> Dict[Tuple[pd.Timestamp, pd.Timestamp], pd.DataFrame]:
+    """
+    Calculate the number of case outcomes per court for several periods in one pass.
+
+    The matching activities are sorted by 'activity_date' once and the window boundaries
+    are located with `np.searchsorted`. The boundaries cut the sorted activities into
+    segments, which are counted per court and broad case type in a single `np.bincount`;
+    each window is then the difference of two cumulative segment counts. The cost is one
+    scan of the data however many windows are asked for.
+
+    Args:
+        df (pd.DataFrame): A pandas DataFrame containing the data.
+        windows (List[Tuple[Union[str, pd.Timestamp], Union[str, pd.Timestamp]]]): (start_date, end_date) pairs, both inclusive.
+        outcome (str): A column representing the outcome of interest.
+        cube (Optional[AggregateCube]): Aggregates of `df`. Used instead of `df` for periods covering whole months
+            when `outcome` is one of the cube flags.
+
+    Returns:
+        Dict[Tuple[pd.Timestamp, pd.Timestamp], pd.DataFrame]: Per (start_date, end_date) window, the
+            table `analyze_court_outcomes` returns for it.
+
+    Raises:
+        ValueError: If a window starts after it ends.
+        KeyError: If required columns are missing.
+    """
+    periods = [(pd.to_datetime(start_date), pd.to_datetime(end_date)) for start_date, end_date in windows]
+    for period_start, period_end in periods:
+        if period_start > period_end:
+            raise ValueError("start_date must be earlier than end_date")
+
+    results: Dict[Tuple[pd.Timestamp, pd.Timestamp], pd.DataFrame] = {}
+    if cube is not None and cube.holds_outcome(outcome):
+        for period in periods:
+            if cube.is_month_aligned(*period):
+                results[period] = cube.court_outcomes(*period, outcome)
+    pending = [period for period in periods if period not in results]
+    if not pending:
+        return results
+
+    required_columns = {'court', 'broad_case_type', 'activity_date', outcome}
+    if not required_columns.issubset(df.columns):
+        missing_columns = required_columns - set(df.columns)
+        raise KeyError(f"Missing required columns: {missing_columns}")
+
+    # Keep the matching activities with a court, a broad case type and a date, sorted by date
+    court_codes, courts = factorize_labels(df['court'])
+    type_codes, case_types = factorize_labels(df['broad_case_type'])
+    dates = df['activity_date'].to_numpy(dtype='datetime64[ns]')
+    keep = (df[outcome] == 1).to_numpy(dtype=bool) & (court_codes >= 0) & (type_codes >= 0) & ~np.isnat(dates)
+    rows = np.flatnonzero(keep)
+    order = np.argsort(dates[rows], kind='stable')
+    dates = dates[rows][order]
+    cells = (court_codes[rows] * len(case_types) + type_codes[rows])[order]
+
+    # Segment boundaries: the first activity of each window and the first one after it
+    starts = np.searchsorted(dates, np.array([start for start, _ in pending], dtype='datetime64[ns]'), side='left')
+    ends = np.searchsorted(dates, np.array([end for _, end in pending], dtype='datetime64[ns]'), side='right')
+    boundaries = np.unique(np.concatenate([starts, ends]))
+    segments = np.searchsorted(boundaries, np.arange(len(dates)), side='right')
+    num_cells = len(courts) * len(case_types)
+    counts = np.bincount(segments * num_cells + cells, minlength=(len(boundaries) + 1) * num_cells)
+    # Segment i holds the activities between boundaries[i - 1] and boundaries[i], so
+    # cumulative[i] counts the activities before boundaries[i]
+    cumulative = counts.reshape(-1, num_cells).cumsum(axis=0)
+
+    for period, start, end in zip(pending, starts, ends):
+        window_counts = cumulative[np.searchsorted(boundaries, end)] - cumulative[np.searchsorted(boundaries, start)]
+        window_counts = window_counts.reshape(len(courts), len(case_types))
+        results[period] = label_table(window_counts, window_counts, df['court'], courts, df['broad_case_type'], case_types).astype(float)
+
+    logger.info(f"Calculated case outcomes per court for {len(periods)} periods.")
+    return {period: results[period] for period in periods}
+
+
 def process_case_time_limits(df: pd.DataFrame, time_limits: Dict[str, int]) -> pd.DataFrame:
     """
     Process the case data by adding age and time limit compliance columns.
 
+    The time limit of each row is taken from a lookup array indexed by its broad case type
+    code, see `pmmu.case_time_limits`. For counts per court and period, see `pmmu.pmmu_compliance`.
+
     Args:
         df (pd.DataFrame): The input DataFrame containing case data.
                            Required columns: 'filed_date', 'activity_date', 'broad_case_type', 'concluded'
-        time_limits (Dict[str, int]): A dictionary with case categories as keys and time limits as values.
+        time_limits (Dict[str, int]): A dictionary with broad case types as keys and time limits in days as values.
 
     Returns:
-        pd.DataFrame: The processed DataFrame with 'age' and 'within_time_limit' columns added.
+        pd.DataFrame: The processed DataFrame with 'age', 'time_limit' and 'within_time_limit' columns added.
+
+    Raises:
+        ValueError: If required columns are missing or the time limits are invalid.
     """
+    required_columns = ['filed_date', 'activity_date', 'broad_case_type', 'concluded']
+    missing_columns = [column for column in required_columns if column not in df.columns]
+    if missing_columns:
+        logger.error(f"Missing required columns: {', '.join(missing_columns)}")
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    validate_time_limits(time_limits)
+
+    df['age'] = df['case_age'] if 'case_age' in df.columns else (df['activity_date'] - df['filed_date']).dt.days
+    df['time_limit'] = case_time_limits(df['broad_case_type'], time_limits)
 
-    # Check if each case is within the time limit and concluded
+    # Rows without a time limit or an age compare False
     df['within_time_limit'] = (
-        (df['age'] <= df['broad_case_type'].map(time_limits).fillna(0)) & 
-        df['concluded']
+        (df['age'].to_numpy(dtype=float) <= df['time_limit'].to_numpy()) &
+        df['concluded'].to_numpy(dtype=bool)
     )
-    
+
     return df
 
 
@@ -227,7 +326,7 @@ def is_concluded(outcome: str, resolved_outcomes: List[str]) -> bool:
     Returns:
         bool: True if the outcome is considered resolved, otherwise False.
     """
-    return outcome.lower() in (resolved.lower() for resolved in resolved_outcomes)
+    return outcome_matcher(resolved_outcomes, OUTCOME_FLAGS['concluded'][1])(outcome)
 
 
 def is_case_registered(outcome: str, activity_date: Union[str, pd.Timestamp], filed_date: Union[str, pd.Timestamp]) -> bool:
@@ -262,7 +361,7 @@ def add_conclusion(df: pd.DataFrame, resolved_outcomes: List[str]) -> pd.DataFra
     Returns:
         pd.DataFrame: DataFrame with 'concluded' column added.
     """
-    df['concluded'] = df['outcome'].apply(lambda outcome: is_concluded(outcome, resolved_outcomes))
+    df['concluded'] = map_unique(df['outcome'], outcome_matcher(resolved_outcomes, OUTCOME_FLAGS['concluded'][1]), False)
     return df
 
 
@@ -276,60 +375,55 @@ def add_registration(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pd.DataFrame: DataFrame with 'registered' column added.
     """
-    df['registered'] = df.apply(
-        lambda row: is_case_registered(row['outcome'], row['activity_date'], row['filed_date']),
-        axis=1
-    )
-    return df
+    # Same criteria as is_case_registered, evaluated over whole columns
+    return default_engine().compute(df, ['registered'])
 
 def add_productivity(df: pd.DataFrame, merit_outcomes: list) -> pd.DataFrame:
     """
     Categorize each row in the DataFrame based on merit and conclusion status.
 
+    An existing 'concluded' column is reused; otherwise it is added from RESOLVED_OUTCOMES.
+
     Args:
-        df (pd.DataFrame): The input DataFrame containing 'outcome' and 'concluded' columns.
+        df (pd.DataFrame): The input DataFrame containing an 'outcome' column.
         merit_outcomes (list): A list of outcomes considered merit outcomes.
 
     Returns:
-        pd.DataFrame: The DataFrame with an additional 'productivity_category' column.
-    """
-    def categorize_row(row):
-        if row['outcome'] in merit_outcomes and row['concluded'] == 1:
-            return 'merit'
-        elif row['outcome'] not in merit_outcomes and row['concluded'] == 1:
-            return 'non-merit'
-        else:
-            return None
-    df = add_case_nature(df, CRIMINAL_CASES)
-    df = add_conclusion(df, RESOLVED_OUTCOMES)
-    # Apply the row categorization
-    df['productivity_category'] = df.apply(categorize_row, axis=1)
-    
-    return df
+        pd.DataFrame: The DataFrame with an additional 'productivity_category' column:
+            'merit' or 'non-merit' for concluded cases and None otherwise.
+    """
+    engine = default_engine()
+    engine.add('merit_outcome', col('outcome').isin(merit_outcomes, OUTCOME_FLAGS['merit'][1]))
+    engine.add('productivity_category', when([
+        (ref('merit_outcome') & ref('concluded'), 'merit'),
+        (~ref('merit_outcome') & ref('concluded'), 'non-merit'),
+    ]))
+    df = engine.compute(df, ['concluded'], overwrite=False)
+    return engine.compute(df, ['productivity_category'])
 
-def get_productivity(df: pd.DataFrame) -> pd.DataFrame:
+def get_productivity(df: pd.DataFrame, cube: Optional[AggregateCube] = None) -> pd.DataFrame:
     """
     Create a pivot table summarizing the productivity category counts by court.
 
     Args:
         df (pd.DataFrame): The input DataFrame with a 'productivity_category' column.
+        cube (Optional[AggregateCube]): Aggregates of `df`, used instead of `df` when given.
 
     Returns:
         pd.DataFrame: The pivot table with merit and non-merit case counts for each court.
     """
-    # Create the pivot table
-    productivity_pivot_table = pd.pivot_table(
-        df,
-        values='concluded',  
-        index='court',     
-        columns='productivity_category', 
-        aggfunc='count',   
-        fill_value=0        
+    if cube is not None:
+        return cube.productivity()
+    # Count the concluded activities per court and productivity category
+    productivity_pivot_table = crosstab(
+        df['court'],
+        df['productivity_category'],
+        mask=df['concluded'].notna().to_numpy()
     ).rename(columns={'merit': 'Merit', 'non-merit': 'Non_Merit'})
 
     return productivity_pivot_table
 
-def calculate_adjournment_proportion(df: pd.DataFrame, non_adjournable: list[str]) -> pd.DataFrame:
+def calculate_adjournment_proportion(df: pd.DataFrame, non_adjournable: list[str], cube: Optional[AggregateCube] = None) -> pd.DataFrame:
     """
     Perform adjournment analysis on the DataFrame by creating columns for adjourned and adjournable events,
     calculating adjourned events per court and reason, and determining adjournment rates.
@@ -337,30 +431,36 @@ def calculate_adjournment_proportion(df: pd.DataFrame, non_adjournable: list[str
     Args:
         df (pd.DataFrame): The input DataFrame containing 'reason_adj', 'comingfor', and 'court' columns.
         non_adjournable (list): A list of 'comingfor' values that are considered non-adjournable.
+        cube (Optional[AggregateCube]): Aggregates of `df`, used instead of `df` when given. Its adjournment
+            flags must have been derived with the same `non_adjournable` list; no columns are added to `df`.
 
     Returns:
         pd.DataFrame: A DataFrame containing adjournment proportions per court.
     """
+    if cube is not None:
+        return cube.adjournment_proportion()
+
     if not all(col in df.columns for col in ['reason_adj', 'comingfor', 'court']):
         raise ValueError("Input DataFrame must contain 'reason_adj', 'comingfor', and 'court' columns.")
 
-    df['comingfor'] = df['comingfor'].str.strip()
+    # Categorical columns were already stripped per category by clean_data
+    if not isinstance(df['comingfor'].dtype, pd.CategoricalDtype):
+        df['comingfor'] = df['comingfor'].str.strip()
+    is_adjournable = ~df['comingfor'].isin(non_adjournable)
 
     # 1. Create 'adjourned' column (1 if 'reason_adj' is not null and 'comingfor' is not in non_adjournable, else 0)
-    df['adjourned'] = (df['reason_adj'].notnull() & df['comingfor'].apply(lambda x: x not in non_adjournable)).astype(int)
+    df['adjourned'] = (df['reason_adj'].notnull() & is_adjournable).astype(int)
 
         # 2. Create 'adjournable' column (1 if 'comingfor' is not in non_adjournable, else 0)
-    df['adjournable'] = df['comingfor'].apply(lambda x: x not in non_adjournable).astype(int)
+    df['adjournable'] = is_adjournable.astype(int)
 
-    # 3. Calculate adjourned events per court and reason_adj
-    adjourned_per_court_reason = df.groupby(['court', 'reason_adj'])['adjourned'].sum().reset_index(name='count')
+    # 3. Sum adjourned and adjournable events per court
+    adjourn_proportion = group_totals(df['court'], {
+        'total_adjourned': df['adjourned'],
+        'total_adjournable': df['adjournable'],
+    })
 
-    # 4. Sum adjourned and adjournable events per court
-    adjourned = df.groupby('court')['adjourned'].sum().reset_index(name='total_adjourned')
-    adjournable = df.groupby('court')['adjournable'].sum().reset_index(name='total_adjournable')
-
-    # 5. Calculate the adjournment proportion per court
-    adjourn_proportion = pd.merge(adjourned, adjournable, on='court')
+    # 4. Calculate the adjournment proportion per court
     adjourn_proportion['adjourn_proportion'] = (adjourn_proportion['total_adjourned'] / adjourn_proportion['total_adjournable']) * 100
 
     return adjourn_proportion
@@ -368,80 +468,238 @@ def calculate_adjournment_proportion(df: pd.DataFrame, non_adjournable: list[str
 
 
 
-def get_monthly_case_stats(df, registered_col, concluded_col):
+def get_monthly_case_stats(df, registered_col, concluded_col, cube: Optional[AggregateCube] = None):
     """Calculates monthly statistics for registered and concluded cases.
 
     Args:
         df (pandas.DataFrame): The input DataFrame containing case data.
         registered_col (str): The name of the column containing registered cases.
         concluded_col (str): The name of the column containing concluded cases.
+        cube (Optional[AggregateCube]): Aggregates of `df`. Used instead of `df` for the 'registered' and 'concluded' columns.
 
     Returns:
         pandas.DataFrame: A DataFrame with monthly statistics for registered and concluded cases.
     """
+    if cube is not None and (registered_col, concluded_col) == ('registered', 'concluded'):
+        return cube.monthly_case_stats()
 
-    monthly_cases = df.groupby(['court', 'date_mon', 'case_type']).agg(
+    monthly_cases = df.groupby(['court', 'date_mon', 'case_type'], observed=True).agg(
         registered=(registered_col, 'sum'),
         concluded=(concluded_col, 'sum')
     ).reset_index()
 
     return monthly_cases
 
-def get_monthly_case_stats(df, registered_col, concluded_col):
-    """Calculates monthly statistics for registered and concluded cases.
+def aggregate_periods(
+    df: pd.DataFrame,
+    measures: Union[List[str], Dict[str, str]],
+    freq: str = 'QE',
+    by: Optional[List[str]] = None,
+    date_column: str = 'activity_date',
+    period_column: str = 'period',
+    cube: Optional[AggregateCube] = None,
+) -> pd.DataFrame:
+    """
+    Sum several measures per period, and optionally per court, nature or other columns, in one groupby.
+
+    Periods are pandas period-end frequencies: 'ME' for months, 'QE' for calendar quarters,
+    'YE' for calendar years and 'YE-JUN' for July to June financial years. Quarters of a
+    financial year ending in June are the calendar quarters, so 'QE' serves for both.
 
     Args:
-        df (pandas.DataFrame): The input DataFrame containing case data.
-        registered_col (str): The name of the column containing registered cases.
-        concluded_col (str): The name of the column containing concluded cases.
+        df (pd.DataFrame): The input DataFrame containing case data.
+        measures (Union[List[str], Dict[str, str]]): Columns to sum, or output column names mapped to the columns to sum.
+        freq (str): Period frequency.
+        by (Optional[List[str]]): Columns to break the periods down by, e.g. ['court'] or ['nature'].
+        date_column (str): The date column assigning activities to periods.
+        period_column (str): Name of the output column holding the last day of each period.
+        cube (Optional[AggregateCube]): Aggregates of `df`. Used instead of `df` when it holds the measures
+            and breakdown columns and the periods are made of whole months.
 
     Returns:
-        pandas.DataFrame: A DataFrame with monthly statistics for registered and concluded cases.
+        pd.DataFrame: One row per period, or per breakdown value and period, with one column per measure.
+            Without a breakdown every period in the data range is listed, with zeros where nothing happened;
+            with one, only the periods in which a breakdown value has activities.
+
+    Raises:
+        ValueError: If required columns are missing in the DataFrame.
     """
+    columns = dict(measures) if isinstance(measures, dict) else {measure: measure for measure in measures}
+    sources = list(dict.fromkeys(columns.values()))
+    by = list(by or [])
 
-    monthly_cases = df.groupby(['court', 'date_mon', 'case_type']).agg(
-        registered=(registered_col, 'sum'),
-        concluded=(concluded_col, 'sum')
-    ).reset_index()
+    if cube is not None and date_column == 'activity_date' and cube.covers(by, sources, freq):
+        df = cube.aggregate(by + ['month'], sources)
+        date_column = 'month'
 
-    return monthly_cases
+    missing_columns = [column for column in [date_column] + by + sources if column not in df.columns]
+    if missing_columns:
+        logger.error(f"Missing required columns: {', '.join(missing_columns)}")
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
 
-def get_cases_per_quarter(df, column):
-    # Group by quarters and count cases
-    cases_per_quarter = df.groupby(pd.Grouper(key='activity_date', freq='QE'))[column].sum()
+    grouper = pd.Grouper(key=date_column, freq=freq)
+    totals = df.groupby(by + [grouper], observed=True)[sources].sum().reset_index()
 
-    # Reset index to make the quarters a column
-    cases_per_quarter = cases_per_quarter.reset_index()
+    stats = totals[by].copy()
+    stats[period_column] = totals[date_column]
+    for name, source in columns.items():
+        stats[name] = totals[source]
+    return stats
 
-    # Rename the columns
-    cases_per_quarter.columns = ['quarter', f'cases_{column}']
 
-    return cases_per_quarter
+def get_cases_per_quarter(df, column, cube: Optional[AggregateCube] = None):
+    return aggregate_periods(df, {f'cases_{column}': column}, 'QE', period_column='quarter', cube=cube)
 
 
-def get_quarterly_stats(df: pd.DataFrame) -> pd.DataFrame:
+def get_quarterly_stats(df: pd.DataFrame, cube: Optional[AggregateCube] = None) -> pd.DataFrame:
     """
     Calculate quarterly statistics for adjourned, adjournable, concluded, and registered cases.
 
     Args:
         df (pd.DataFrame): The input DataFrame containing case data.
+        cube (Optional[AggregateCube]): Aggregates of `df`, used instead of `df` when given.
 
     Returns:
         pd.DataFrame: A DataFrame with quarterly statistics.
     """
-    quarterly_adjourned = get_cases_per_quarter(df, 'adjourned')
-    quarterly_adjournable = get_cases_per_quarter(df, 'adjournable')
-    quarterly_concluded = get_cases_per_quarter(df, 'concluded')
-    quarterly_registered = get_cases_per_quarter(df, 'registered')
-    
-    # Merge quarterly data on quarter column
-    quarterly_stats = quarterly_adjourned.merge(
-        quarterly_adjournable, on='quarter'
-    ).merge(
-        quarterly_concluded, on='quarter'
-    ).merge(
-        quarterly_registered, on='quarter'
-    )
-    
-    return quarterly_stats
+    measures = {f'cases_{column}': column for column in ['adjourned', 'adjournable', 'concluded', 'registered']}
+    return aggregate_periods(df, measures, 'QE', period_column='quarter', cube=cube)
+
+
+
+def _judgment_segments(df: pd.DataFrame, columns: List[str]):
+    required_columns = ['case_number', 'activity_date', 'outcome'] + columns
+    missing_columns = [column for column in required_columns if column not in df.columns]
+    if missing_columns:
+        logger.error(f"Missing required columns: {', '.join(missing_columns)}")
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+    # Undated activities still set and deliver judgments
+    segments = segment_cases(df, keep_undated=True)
+    cases = pd.DataFrame(index=segments.case_numbers)
+    if 'court' in df.columns:
+        cases['court'] = df['court'].iloc[segments.order[segments.starts]].array
+    return segments, cases
+
+
+def determine_judgment_scheduling(
+    df: pd.DataFrame,
+    cutoff_date: Union[str, pd.Timestamp],
+    set_outcomes: List[str] = JUDGMENT_DATE_SET_OUTCOMES,
+    delivered_outcomes: List[str] = JUDGMENT_DELIVERED_OUTCOMES,
+) -> pd.DataFrame:
+    """
+    Check per case whether judgment was delivered on the date it was set for.
+
+    A case is scheduled by its first activity setting a judgment date for on or before
+    `cutoff_date`, and `set_date` is that 'next_date'. The judgment is 'Delivered' at the first
+    delivery on or after the set date, 'On Time' if on it and 'Delayed' if later, or at an
+    earlier delivery, which is 'On Time'. Without a delivery the judgment is 'Delayed'.
+
+    Cases are segments of one sort of the activities, see `lifecycle.segment_cases`, and each
+    step is a reduction over the segments.
+
+    Args:
+        df (pd.DataFrame): Activities with 'case_number', 'activity_date', 'next_date', 'outcome' and, optionally, 'court'.
+        cutoff_date (Union[str, pd.Timestamp]): Last judgment date set to consider, e.g. the end of the reporting period.
+        set_outcomes (List[str]): Outcomes setting a judgment date.
+        delivered_outcomes (List[str]): Outcomes delivering a judgment.
 
+    Returns:
+        pd.DataFrame: One row per scheduled case, indexed by case number, with 'court', 'set_date',
+            'delivery_date', 'judgment_status' and 'delivery_category'.
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    segments, cases = _judgment_segments(df, ['next_date'])
+    order, starts = segments.order, segments.starts
+    dates = df['activity_date'].to_numpy(dtype='datetime64[ns]')[order]
+    next_dates = df['next_date'].to_numpy(dtype='datetime64[ns]')[order]
+    is_set = df['outcome'].isin(set_outcomes).to_numpy()[order]
+    is_delivered = df['outcome'].isin(delivered_outcomes).to_numpy()[order]
+
+    # The judgment date set by the first activity setting one, per case and then per activity
+    first_set = first_position(is_set & (next_dates <= np.datetime64(pd.Timestamp(cutoff_date))), starts)
+    scheduled = first_set < len(order)
+    set_date = np.where(scheduled, next_dates[np.minimum(first_set, max(len(order) - 1, 0))], np.datetime64('NaT'))
+    set_date_per_activity = np.repeat(set_date, segments.sizes)
+
+    delivered_after = earliest(dates, is_delivered & (dates >= set_date_per_activity), starts)
+    delivered_before = earliest(dates, is_delivered & (dates < set_date_per_activity), starts)
+    after, before = ~np.isnat(delivered_after), ~np.isnat(delivered_before)
+
+    cases['set_date'] = set_date
+    cases['delivery_date'] = np.where(after, delivered_after, delivered_before)
+    cases['judgment_status'] = np.where(after | before, 'Delivered', 'Delayed')
+    cases['delivery_category'] = np.where(after, np.where(delivered_after <= set_date, 'On Time', 'Delayed'), np.where(before, 'On Time', 'Delayed'))
+    cases = cases[scheduled]
+
+    logger.info(f"Determined judgment scheduling of {len(cases)} scheduled cases")
+    return cases
+
+
+def calculate_judgment_time(
+    df: pd.DataFrame,
+    set_outcomes: List[str] = JUDGMENT_DATE_SET_OUTCOMES,
+    delivered_outcomes: List[str] = JUDGMENT_DELIVERED_OUTCOMES,
+    judgment_comingfor: str = JUDGMENT_COMINGFOR,
+) -> pd.DataFrame:
+    """
+    Calculate the days from setting a judgment date to delivering the judgment, per case.
+
+    The set date is the first activity setting a judgment date and the delivery date the last
+    activity delivering one. Cases delivered without a set date fall back to the last activity
+    before they were first listed for judgment.
+
+    Args:
+        df (pd.DataFrame): Activities with 'case_number', 'activity_date', 'outcome', 'comingfor' and, optionally, 'court'.
+        set_outcomes (List[str]): Outcomes setting a judgment date.
+        delivered_outcomes (List[str]): Outcomes delivering a judgment.
+        judgment_comingfor (str): 'comingfor' of activities listed for judgment.
+
+    Returns:
+        pd.DataFrame: One row per case with both dates, indexed by case number, with 'court', 'set_date',
+            'delivery_date' and 'time_taken_days'.
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    segments, cases = _judgment_segments(df, ['comingfor'])
+    order, starts = segments.order, segments.starts
+    dates = df['activity_date'].to_numpy(dtype='datetime64[ns]')[order]
+    is_set = df['outcome'].isin(set_outcomes).to_numpy()[order]
+    is_delivered = df['outcome'].isin(delivered_outcomes).to_numpy()[order]
+    is_judgment = (df['comingfor'] == judgment_comingfor).to_numpy(dtype=bool)[order]
+
+    set_date = earliest(dates, is_set, starts)
+    delivery_date = latest(dates, is_delivered, starts)
+    first_listed = np.repeat(earliest(dates, is_judgment, starts), segments.sizes)
+    before_listing = latest(dates, dates < first_listed, starts)
+    set_date = np.where(np.isnat(set_date) & ~np.isnat(delivery_date), before_listing, set_date)
+
+    timed = ~np.isnat(set_date) & ~np.isnat(delivery_date)
+    cases = cases[timed]
+    cases['set_date'] = set_date[timed]
+    cases['delivery_date'] = delivery_date[timed]
+    cases['time_taken_days'] = (delivery_date[timed] - set_date[timed]) // np.timedelta64(1, 'D')
+
+    logger.info(f"Calculated judgment time of {len(cases)} cases")
+    return cases
+
+
+def get_on_time_delivery_proportions(scheduling: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the proportion of scheduled judgments delivered on time per court.
+
+    Args:
+        scheduling (pd.DataFrame): Per-case judgment scheduling, see `determine_judgment_scheduling`.
+
+    Returns:
+        pd.DataFrame: Per court, 'total_scheduled', 'delivered_on_time' and 'proportion_on_time'.
+    """
+    court_stats = group_totals(scheduling['court'], {
+        'total_scheduled': np.ones(len(scheduling), dtype=np.int64),
+        'delivered_on_time': (scheduling['delivery_category'] == 'On Time').to_numpy(),
+    }).set_index('court')
+    court_stats['proportion_on_time'] = court_stats['delivered_on_time'] / court_stats['total_scheduled']
+    return court_stats
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Union
+
+from . logging_config import logger
+from . crosstab import factorize_labels
+from . utils import validate_columns
+
+DateLike = Union[str, pd.Timestamp]
+
+# Age buckets of pending cases, by their lowest age in days
+AGE_BUCKETS: Dict[str, int] = {
+    '<1y': 0,
+    '1-3y': 365,
+    '3-5y': 3 * 365,
+    '>5y': 5 * 365,
+}
+
+
+def month_ends(start_date: DateLike, end_date: DateLike) -> pd.DatetimeIndex:
+    """
+    List the month ends from `start_date` to `end_date`, as snapshot dates.
+    """
+    return pd.date_range(start_date, end_date, freq='ME')
+
+
+def _day_numbers(dates: Union[np.ndarray, pd.Series, pd.Index]) -> np.ndarray:
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def backlog_snapshots(
+    cases: pd.DataFrame,
+    as_of: Iterable[DateLike],
+    by: Optional[str] = 'court',
+    buckets: Dict[str, int] = AGE_BUCKETS,
+) -> pd.DataFrame:
+    """
+    Count pending cases and their age buckets at many as-of dates with one sort.
+
+    A case is pending at date t if it was filed on or before t and not concluded on or before t;
+    its age at t is the number of days since filing. For each age bound a, the cases pending at t
+    that are at least a days old are those with `filed + a <= t < max(filed + a, concluded)`. So
+    each case turns into a +1 event on day `filed + a` and, once concluded, a -1 event on day
+    `max(filed + a, concluded)`, and the count at t is the sum of the events up to t.
+
+    The +1 and -1 events of all age bounds and groups are each sorted once by (bound, group, day),
+    and every (bound, group, as-of date) count is the difference of two `np.searchsorted`
+    positions, the cumulative number of +1 events up to t less the -1 events up to t.
+
+    Only the cases in `cases` are counted, so the activity log it was built from must reach back
+    far enough to include every case pending at the earliest as-of date.
+
+    Args:
+        cases (pd.DataFrame): One row per case with 'filed_date', 'conclusion_date' (NaT while pending)
+            and `by`, see `lifecycle.case_lifecycle`.
+        as_of (Iterable[DateLike]): Snapshot dates, e.g. `month_ends(...)`.
+        by (Optional[str]): Column to count per value of, e.g. 'court'. None counts all cases together.
+        buckets (Dict[str, int]): Age bucket names mapped to their lowest age in days, in increasing order.
+
+    Returns:
+        pd.DataFrame: One row per `by` value and as-of date, with 'pending' and one count per age bucket.
+
+    Raises:
+        ValueError: If required columns are missing or the bucket bounds are not increasing.
+    """
+    validate_columns(cases, ['filed_date', 'conclusion_date'] + ([by] if by else []))
+    bounds = np.array(list(buckets.values()), dtype=np.int64)
+    if len(bounds) == 0 or bounds[0] != 0 or np.any(np.diff(bounds) <= 0):
+        raise ValueError("Age buckets must start at 0 days and increase")
+
+    filed = _day_numbers(cases['filed_date'])
+    concluded = _day_numbers(cases['conclusion_date'])
+    nat = np.iinfo(np.int64).min
+    if by:
+        codes, labels = factorize_labels(cases[by])
+    else:
+        codes, labels = np.zeros(len(cases), dtype=np.int64), pd.Index(['all'])
+    valid = (filed != nat) & (codes >= 0)
+    if not valid.all():
+        logger.warning(f"Left {int((~valid).sum())} cases without a filing date or {by} out of the backlog")
+    filed, concluded, codes = filed[valid], concluded[valid], codes[valid]
+    snapshots = pd.DatetimeIndex(pd.to_datetime(list(as_of))).normalize()
+    days = _day_numbers(snapshots)
+
+    # +1 when a case reaches each age bound, -1 when it is concluded past that bound
+    reached = filed[None, :] + bounds[:, None]
+    closed = np.where(concluded == nat, nat, np.maximum(reached, concluded[None, :]))
+    bound_index = np.broadcast_to(np.arange(len(bounds))[:, None], reached.shape)
+    group_index = np.broadcast_to(codes[None, :], reached.shape)
+    is_closed = closed != nat
+
+    # Events after the last as-of date never count, so they are all put on the day after it
+    last = int(days.max(initial=0)) + 1
+    reached = np.minimum(reached, last)
+    closed = np.where(is_closed, np.minimum(closed, last), nat)
+    origin = min(int(reached.min(initial=0)), int(days.min(initial=0)))
+    span = last - origin + 1
+
+    def keys(bound: np.ndarray, group: np.ndarray, day: np.ndarray) -> np.ndarray:
+        return (bound * len(labels) + group) * span + (day - origin)
+
+    opened_keys = np.sort(keys(bound_index, group_index, reached), axis=None)
+    closed_keys = np.sort(keys(bound_index[is_closed], group_index[is_closed], closed[is_closed]))
+
+    # Events up to (bound, group, day) minus those of earlier (bound, group) pairs, for each sign
+    query_bound, query_group, query_day = np.meshgrid(np.arange(len(bounds)), np.arange(len(labels)), days, indexing='ij')
+    upto = keys(query_bound, query_group, query_day)
+    start = keys(query_bound, query_group, np.full_like(query_day, origin))
+
+    def count(events: np.ndarray) -> np.ndarray:
+        return np.searchsorted(events, upto, side='right') - np.searchsorted(events, start, side='left')
+    at_least = count(opened_keys) - count(closed_keys)
+
+    groups = np.repeat(np.arange(len(labels)), len(snapshots))
+    backlog = pd.DataFrame({'as_of': np.tile(snapshots.to_numpy(), len(labels)), 'pending': at_least[0].ravel()})
+    if by and isinstance(cases[by].dtype, pd.CategoricalDtype):
+        backlog.insert(0, by, pd.Categorical.from_codes(groups, dtype=cases[by].dtype))
+    elif by:
+        backlog.insert(0, by, labels.take(groups))
+    # Cases in a bucket are at least its lowest age but not the next bucket's
+    for index, name in enumerate(buckets):
+        upper = at_least[index + 1].ravel() if index + 1 < len(bounds) else 0
+        backlog[name] = at_least[index].ravel() - upper
+
+    logger.info(f"Computed backlog of {len(filed)} cases at {len(snapshots)} dates")
+    return backlog
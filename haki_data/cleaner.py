@@ -1,9 +1,124 @@
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Union, Optional
+from typing import Dict, Any, Callable, List, Union, Optional
 
 from . logging_config import logger
 
+def map_categories(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """
+    Apply a function to each category of a categorical Series instead of to every row.
+
+    Categories that map to the same value are merged and null results become missing values.
+
+    Args:
+        series (pd.Series): A categorical Series.
+        func (Callable[[Any], Any]): The function applied to each category.
+
+    Returns:
+        pd.Series: A categorical Series with the mapped values.
+    """
+    mapped = [func(category) for category in series.cat.categories]
+    inverse, uniques = pd.factorize(pd.Series(mapped, dtype=object))
+    # The trailing -1 is picked up by the -1 code of missing values
+    inverse = np.append(inverse, -1)
+    codes = inverse[series.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index, name=series.name)
+
+def _strip_text(value: Any) -> Any:
+    return value.strip() if isinstance(value, str) else value
+
+_WHITESPACE = re.compile(r'\s+')
+
+def text_normalizer(strip: bool = True, collapse_whitespace: bool = False, title_case: bool = False) -> Callable[[Any], Any]:
+    """
+    Build a function applying the requested normalizations to a single value.
+
+    Non-string values are returned unchanged.
+
+    Args:
+        strip (bool): Remove leading and trailing whitespace.
+        collapse_whitespace (bool): Replace runs of whitespace with a single space.
+        title_case (bool): Convert to title case.
+
+    Returns:
+        Callable[[Any], Any]: The normalizing function.
+    """
+    def normalize(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        if collapse_whitespace:
+            value = _WHITESPACE.sub(' ', value)
+        if strip:
+            value = value.strip()
+        if title_case:
+            value = value.title()
+        return value
+    return normalize
+
+def normalize_text(series: pd.Series, strip: bool = True, collapse_whitespace: bool = False, title_case: bool = False) -> pd.Series:
+    """
+    Normalize a text column once per distinct value instead of once per row.
+
+    The column is dictionary encoded, the normalization runs over the distinct values only and
+    the results are mapped back through the codes. Nulls stay null. Categorical columns keep
+    their dtype (categories that normalize to the same value are merged), string columns keep
+    their dtype and other columns come back as object.
+
+    Args:
+        series (pd.Series): The column to normalize.
+        strip (bool): Remove leading and trailing whitespace.
+        collapse_whitespace (bool): Replace runs of whitespace with a single space.
+        title_case (bool): Convert to title case.
+
+    Returns:
+        pd.Series: The normalized column.
+    """
+    normalize = text_normalizer(strip, collapse_whitespace, title_case)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return map_categories(series, normalize)
+    codes, uniques = pd.factorize(series)
+    # The trailing NaN is picked up by the -1 code of missing values
+    labels = np.array([normalize(value) for value in uniques] + [np.nan], dtype=object)
+    normalized = pd.Series(labels[codes], index=series.index, name=series.name)
+    if isinstance(series.dtype, pd.StringDtype):
+        normalized = normalized.astype(series.dtype)
+    return normalized
+
+def is_text_column(series: pd.Series) -> bool:
+    """
+    Check whether a column can hold text, i.e. is categorical, string or object.
+    """
+    dtype = series.dtype
+    return isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)) or pd.api.types.is_object_dtype(dtype)
+
+def normalize_text_columns(
+    df: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    title_case_columns: Optional[List[str]] = None,
+    collapse_whitespace: bool = False,
+) -> pd.DataFrame:
+    """
+    Strip the text columns of a DataFrame and title-case some of them, once per distinct value.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to modify.
+        columns (Optional[List[str]]): Columns to strip. Defaults to every text column.
+        title_case_columns (Optional[List[str]]): Columns also converted to title case.
+        collapse_whitespace (bool): Also replace runs of whitespace with a single space.
+
+    Returns:
+        pd.DataFrame: The DataFrame with normalized columns.
+    """
+    title_case_columns = set(title_case_columns or [])
+    if columns is None:
+        columns = [column for column in df.columns if is_text_column(df[column])]
+    for column in columns:
+        df[column] = normalize_text(df[column], collapse_whitespace=collapse_whitespace, title_case=column in title_case_columns)
+    for column in title_case_columns - set(columns):
+        df[column] = normalize_text(df[column], strip=False, title_case=True)
+    return df
+
 def drop_nan_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
     """
     Drop rows containing NaN values from the specified columns of a DataFrame.
@@ -58,11 +173,11 @@ def remove_duplicates(data: pd.DataFrame) -> pd.DataFrame:
     num_duplicates = data.duplicated().sum()
     
     if num_duplicates > 0:
-        logging.info(f"{num_duplicates} duplicates found.")
+        logger.info(f"{num_duplicates} duplicates found.")
         data = data.drop_duplicates(keep="first").reset_index(drop=True)
-        logging.info(f"{num_duplicates} duplicates removed.")
+        logger.info(f"{num_duplicates} duplicates removed.")
     else:
-        logging.info("No duplicates found.")
+        logger.info("No duplicates found.")
     
     return data
 
@@ -78,7 +193,10 @@ def drop_null_values(df: pd.DataFrame, column_name: str = 'outcome') -> pd.DataF
     Returns:
         pd.DataFrame: The DataFrame with rows containing null values in the specified column dropped.
     """
-    df['outcome'] = df['outcome'].str.strip()
+    if isinstance(df['outcome'].dtype, pd.CategoricalDtype):
+        df['outcome'] = map_categories(df['outcome'], _strip_text)
+    else:
+        df['outcome'] = df['outcome'].str.strip()
     initial_row_count: int = df.shape[0]
     cleaned_df: pd.DataFrame = df.dropna(subset=[column_name])
     final_row_count: int = cleaned_df.shape[0]
@@ -94,6 +212,9 @@ def drop_null_values(df: pd.DataFrame, column_name: str = 'outcome') -> pd.DataF
 def strip_dataframe_columns(df):
     """Strips leading and trailing whitespace from all columns in a Pandas DataFrame.
 
+    Text columns are stripped once per distinct value with `normalize_text` and keep their
+    nulls; numeric and datetime columns are left as they are.
+
     Args:
         df (pandas.DataFrame): The DataFrame to modify.
 
@@ -102,7 +223,7 @@ def strip_dataframe_columns(df):
     """
 
     try:
-        df = df.astype(str).apply(lambda x: x.str.strip())
+        df = normalize_text_columns(df)
         logger.info("str.strip() applied successfully to all columns.")
         return df
     except Exception as e:
@@ -131,7 +252,7 @@ def apply_title_case(text, column):
 
 def convert_to_title_case(df: pd.DataFrame, column: str) -> pd.DataFrame:
     """
-    Process the specified column of the DataFrame by applying title case.
+    Process the specified column of the DataFrame by applying title case once per distinct value.
 
     Args:
         df (pd.DataFrame): The input DataFrame.
@@ -147,9 +268,7 @@ def convert_to_title_case(df: pd.DataFrame, column: str) -> pd.DataFrame:
 
     original_null_count = df[column].isnull().sum()
 
-    # Apply the title case function to the column
-    df[column] = df[column].apply(lambda x: apply_title_case(x, column))
-
+    df[column] = normalize_text(df[column], strip=False, title_case=True)
 
     return df
 
@@ -3,6 +3,65 @@ from typing import Dict, List
 NAME_MAP: Dict[str, str] = {'_High Court Div': '', '_High Court Civil': '', '_High Court Criminal': ''}
 
 
+# Declared dtypes of the DCRT return layout. Low-cardinality text is categorical, free text is
+# a nullable string and date parts and party counts are small nullable integers.
+COLUMN_DTYPES: Dict[str, str] = {
+    'court_name': 'category',
+    'court': 'category',
+    'date_dd': 'Int8',
+    'date_mon': 'category',
+    'date_yyyy': 'Int16',
+    'caseid_type': 'category',
+    'caseid_no': 'string',
+    'filed_dd': 'Int8',
+    'filed_mon': 'category',
+    'filed_yyyy': 'Int16',
+    'original_court': 'category',
+    'original_code': 'category',
+    'original_number': 'string',
+    'original_year': 'Int16',
+    'case_type': 'category',
+    'judge_1': 'category',
+    'judge_2': 'category',
+    'judge_3': 'category',
+    'judge_4': 'category',
+    'judge_5': 'category',
+    'judge_6': 'category',
+    'judge_7': 'category',
+    'comingfor': 'category',
+    'outcome': 'category',
+    'reason_adj': 'category',
+    'next_dd': 'Int8',
+    'next_mon': 'category',
+    'next_yyyy': 'Int16',
+    'male_applicant': 'Int16',
+    'female_applicant': 'Int16',
+    'organization_applicant': 'Int16',
+    'male_defendant': 'Int16',
+    'female_defendant': 'Int16',
+    'organization_defendant': 'Int16',
+    'legalrep': 'category',
+    'applicant_witness': 'Int16',
+    'defendant_witness': 'Int16',
+    'custody': 'category',
+    'other_details': 'string',
+}
+
+
+# Month names as written in DCRT returns, matched on their first three letters
+MONTH_NUMBERS: Dict[str, int] = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+
+# Date columns built from the [year, month, day] part columns of the DCRT layout
+DATE_PARTS: Dict[str, List[str]] = {
+    'activity_date': ['date_yyyy', 'date_mon', 'date_dd'],
+    'filed_date': ['filed_yyyy', 'filed_mon', 'filed_dd'],
+    'next_date': ['next_yyyy', 'next_mon', 'next_dd'],
+}
+
 
 CRIMINAL_CASES: List[str] = [
     'Murder Case',
@@ -194,13 +253,14 @@ MERIT_CATEGORY: Dict[str, List[str]] = {
 }
 
 
+# PMMU time limits in days from filing to conclusion, keyed by BROAD_CASE_TYPES category
 TIME_LIMITS: Dict[str, int] = {
-    'murder': 360,
-    'revision': 90,
-    'misc_application': 90,
-    'suit': 360,
-    'judicial_review': 180,
-    'constitutional_petition': 180,
+    'Murder': 360,
+    'Criminal Revision': 90,
+    'Miscellaneous Application': 90,
+    'Civil Suit': 360,
+    'Judicial Review': 180,
+    'Constitution Petition': 180,
 }
 
 
@@ -231,3 +291,24 @@ MERIT_OUTCOMES: List[str] = [
     'Ruling Delivered- Accused Discharged',
     'Retrial'
 ]
+
+
+# Outcomes setting a judgment date, and the 'next_date' they set
+JUDGMENT_DATE_SET_OUTCOMES: List[str] = [
+    'Judgment Date Given',
+    'Judgment On Notice',
+    'Judgment Date Set',
+]
+
+
+JUDGMENT_DELIVERED_OUTCOMES: List[str] = [
+    'Grant Revoked',
+    'Judgment Delivered',
+    'Judgment Delivered- Acquittal',
+    'Judgment Delivered- Case Closed',
+    'Judgment Delivered- Convicted',
+]
+
+
+# 'comingfor' of activities listed for judgment
+JUDGMENT_COMINGFOR: str = 'Judgement'
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Tuple, Union
+
+ArrayLike = Union[np.ndarray, pd.Series]
+
+
+def factorize_labels(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Get integer codes and sorted labels of a column, reusing the codes of categorical columns.
+
+    Args:
+        series (pd.Series): The column to encode.
+
+    Returns:
+        Tuple[np.ndarray, pd.Index]: One code per row, -1 for missing values, and the labels the
+            codes index. Categorical labels keep their category order, others are sorted.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(dtype=np.int64), series.cat.categories
+    codes, labels = pd.factorize(series, sort=True)
+    return codes.astype(np.int64, copy=False), pd.Index(labels)
+
+
+def _observed_index(series: pd.Series, labels: pd.Index, present: np.ndarray) -> pd.Index:
+    observed = labels[present]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # As groupby(observed=True) does: the observed categories, with the dtype of the column
+        return pd.CategoricalIndex(observed, dtype=series.dtype, name=series.name)
+    return pd.Index(observed, name=series.name)
+
+
+def _selection(keep: np.ndarray) -> Union[slice, np.ndarray]:
+    # Taking every row would copy each input for nothing
+    return slice(None) if keep.all() else np.flatnonzero(keep)
+
+
+def _totals(cells: np.ndarray, size: int, values: Optional[ArrayLike]) -> np.ndarray:
+    if values is None:
+        return np.bincount(cells, minlength=size)
+    values = np.asarray(values)
+    sums = np.bincount(cells, weights=values, minlength=size)
+    # bincount sums in float64; integer and boolean sums are exact well beyond the row counts seen here
+    return sums.astype(np.int64) if values.dtype.kind in 'biu' else sums
+
+
+def crosstab(
+    index: pd.Series,
+    columns: pd.Series,
+    values: Optional[ArrayLike] = None,
+    mask: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Count rows, or sum values, per pair of index and column labels with one `np.bincount`.
+
+    The labels are encoded as integer codes, see `factorize_labels`, and each row is counted
+    in the cell `index_code * num_columns + column_code` of a dense table. Like
+    `groupby([...], observed=True)` followed by `pivot_table(fill_value=0)`, only labels with
+    rows are kept and rows with a missing label are dropped.
+
+    Args:
+        index (pd.Series): Row labels, e.g. 'court'.
+        columns (pd.Series): Column labels, e.g. 'broad_case_type'.
+        values (Optional[ArrayLike]): Values to sum per cell. Defaults to counting rows.
+        mask (Optional[np.ndarray]): Boolean mask of the rows to include. Defaults to all rows.
+
+    Returns:
+        pd.DataFrame: The table, indexed and labelled by the observed labels and named after `index` and `columns`.
+    """
+    index_codes, index_labels = factorize_labels(index)
+    column_codes, column_labels = factorize_labels(columns)
+    keep = (index_codes >= 0) & (column_codes >= 0)
+    if mask is not None:
+        keep &= np.asarray(mask, dtype=bool)
+    rows = _selection(keep)
+    cells = index_codes[rows] * len(column_labels) + column_codes[rows]
+    size = len(index_labels) * len(column_labels)
+
+    counts = np.bincount(cells, minlength=size).reshape(len(index_labels), len(column_labels))
+    totals = counts if values is None else _totals(cells, size, np.asarray(values)[rows]).reshape(counts.shape)
+    return label_table(totals, counts, index, index_labels, columns, column_labels)
+
+
+def label_table(
+    totals: np.ndarray,
+    counts: np.ndarray,
+    index: pd.Series,
+    index_labels: pd.Index,
+    columns: pd.Series,
+    column_labels: pd.Index,
+) -> pd.DataFrame:
+    """
+    Label a dense table of cell totals, keeping the index and column labels that have rows.
+
+    Args:
+        totals (np.ndarray): Cell totals, one row per index label and one column per column label.
+        counts (np.ndarray): Number of rows per cell, deciding which labels are observed.
+        index (pd.Series): The column the index labels come from.
+        index_labels (pd.Index): Labels of the table rows, see `factorize_labels`.
+        columns (pd.Series): The column the column labels come from.
+        column_labels (pd.Index): Labels of the table columns.
+
+    Returns:
+        pd.DataFrame: The table of the observed labels.
+    """
+    present_rows, present_columns = counts.any(axis=1), counts.any(axis=0)
+    return pd.DataFrame(
+        totals[np.ix_(present_rows, present_columns)],
+        index=_observed_index(index, index_labels, present_rows),
+        columns=_observed_index(columns, column_labels, present_columns),
+    )
+
+
+def group_totals(keys: pd.Series, values: Dict[str, ArrayLike], mask: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Sum several value columns per label with one `np.bincount` each.
+
+    Equivalent to `groupby(keys, observed=True)[...].sum().reset_index()` for a single key.
+
+    Args:
+        keys (pd.Series): The labels to group by, e.g. 'court'.
+        values (Dict[str, ArrayLike]): Output column names mapped to the values to sum.
+        mask (Optional[np.ndarray]): Boolean mask of the rows to include. Defaults to all rows.
+
+    Returns:
+        pd.DataFrame: One row per observed label, with the label column and one column per sum.
+    """
+    codes, labels = factorize_labels(keys)
+    keep = codes >= 0
+    if mask is not None:
+        keep &= np.asarray(mask, dtype=bool)
+    rows = _selection(keep)
+    present = np.bincount(codes[rows], minlength=len(labels)) > 0
+    totals = pd.DataFrame({keys.name: _observed_index(keys, labels, present)})
+    for name, column in values.items():
+        totals[name] = _totals(codes[rows], len(labels), np.asarray(column)[rows])[present]
+    return totals
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, Optional, Union
+
+from . logging_config import logger
+from . crosstab import crosstab
+
+DateLike = Union[str, pd.Timestamp]
+
+# Dimensions of the cube. 'month' is the first day of the activity month; 'date_mon' and
+# 'case_type' are kept because the monthly stats group by them, and add no cells since
+# they are determined by 'month' and by the case type respectively.
+CUBE_DIMENSIONS: List[str] = ['court', 'case_type', 'broad_case_type', 'nature', 'date_mon', 'month', 'outcome_class']
+
+# Counts summed per cell, on top of the number of 'rows'
+CUBE_FLAGS: List[str] = ['registered', 'concluded', 'merit', 'adjourned', 'adjournable']
+
+# Columns the cube is built from
+CUBE_COLUMNS: List[str] = ['court', 'case_type', 'broad_case_type', 'nature', 'date_mon', 'activity_date', 'case_age'] + CUBE_FLAGS
+
+
+def outcome_class(concluded: np.ndarray, merit: np.ndarray) -> pd.Categorical:
+    """
+    Classify activities as 'merit' or 'non-merit' conclusions, or 'open'.
+
+    Args:
+        concluded (np.ndarray): Boolean concluded flags.
+        merit (np.ndarray): Boolean merit outcome flags.
+
+    Returns:
+        pd.Categorical: The class of each activity.
+    """
+    codes = np.where(concluded, np.where(merit, 0, 1), 2).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=['merit', 'non-merit', 'open'])
+
+
+class AggregateCube:
+    """
+    Activity counts aggregated once over court, case type, nature, month and outcome class.
+
+    Each cell holds the number of activity 'rows', the number of them flagged 'registered',
+    'concluded', 'merit', 'adjourned' and 'adjournable', and the sum and count of their
+    'case_age'. Summaries are answered by re-aggregating the cells, which number in the
+    thousands, instead of the activity rows.
+
+    Args:
+        cells (pd.DataFrame): One row per non-empty cell, with the CUBE_DIMENSIONS and the measures.
+    """
+
+    def __init__(self, cells: pd.DataFrame) -> None:
+        self.cells = cells
+
+    @classmethod
+    def build(cls, df: pd.DataFrame) -> 'AggregateCube':
+        """
+        Aggregate the activity rows into cube cells in one groupby.
+
+        Args:
+            df (pd.DataFrame): Transformed data holding the CUBE_COLUMNS.
+
+        Returns:
+            AggregateCube: The cube.
+
+        Raises:
+            ValueError: If a required column is missing.
+        """
+        missing = set(CUBE_COLUMNS) - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+
+        flags = {flag: df[flag].to_numpy(dtype=np.int64) for flag in CUBE_FLAGS}
+        age = df['case_age']
+        frame = pd.DataFrame({
+            'court': df['court'],
+            'case_type': df['case_type'],
+            'broad_case_type': df['broad_case_type'],
+            'nature': df['nature'],
+            'date_mon': df['date_mon'],
+            'month': df['activity_date'].to_numpy().astype('datetime64[M]').astype('datetime64[ns]'),
+            'outcome_class': outcome_class(flags['concluded'].astype(bool), flags['merit'].astype(bool)),
+            'rows': 1,
+            **flags,
+            'case_age_sum': age.fillna(0).to_numpy(dtype=np.int64),
+            'case_age_count': age.notna().to_numpy(dtype=np.int64),
+        }, index=df.index)
+        cells = frame.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=True).sum().reset_index()
+        logger.info(f"Built aggregate cube of {len(cells)} cells from {len(df)} rows")
+        return cls(cells)
+
+    def aggregate(self, by: Iterable[str], measures: Optional[List[str]] = None, start_month: Optional[DateLike] = None, end_month: Optional[DateLike] = None) -> pd.DataFrame:
+        """
+        Sum the measures over the given dimensions.
+
+        Args:
+            by (Iterable[str]): Dimensions to keep.
+            measures (Optional[List[str]]): Measures to sum. Defaults to all.
+            start_month (Optional[DateLike]): First activity month to include.
+            end_month (Optional[DateLike]): Last activity month to include.
+
+        Returns:
+            pd.DataFrame: One row per observed combination of the dimensions.
+        """
+        cells = self.cells
+        if start_month is not None or end_month is not None:
+            mask = np.ones(len(cells), dtype=bool)
+            if start_month is not None:
+                mask &= (cells['month'] >= pd.Timestamp(start_month).to_period('M').start_time).to_numpy()
+            if end_month is not None:
+                mask &= (cells['month'] <= pd.Timestamp(end_month).to_period('M').start_time).to_numpy()
+            cells = cells[mask]
+        measures = measures or [column for column in cells.columns if column not in CUBE_DIMENSIONS]
+        return cells.groupby(list(by), observed=True, sort=True)[measures].sum().reset_index()
+
+    def covers(self, by: Iterable[str], measures: Iterable[str], freq: str) -> bool:
+        """
+        Check whether the cube can sum the measures per period of `freq` broken down by `by`.
+
+        Args:
+            by (Iterable[str]): Breakdown columns.
+            measures (Iterable[str]): Measures to sum.
+            freq (str): Period frequency, which must be made of whole months.
+
+        Returns:
+            bool: True if the cube holds the breakdown and the measures and the periods are whole months.
+        """
+        try:
+            offset = pd.tseries.frequencies.to_offset(freq)
+        except ValueError:
+            return False
+        monthly = isinstance(offset, (pd.offsets.MonthEnd, pd.offsets.QuarterEnd, pd.offsets.YearEnd))
+        return monthly and set(by) <= set(CUBE_DIMENSIONS) and set(measures) <= set(self.cells.columns) - set(CUBE_DIMENSIONS)
+
+    @staticmethod
+    def is_month_aligned(start_date: DateLike, end_date: DateLike) -> bool:
+        """
+        Check whether a date window covers whole activity months, so that the cube can answer it.
+        """
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        return start == start.to_period('M').start_time and end.normalize() == end.to_period('M').end_time.normalize()
+
+    @staticmethod
+    def holds_outcome(outcome: str) -> bool:
+        """
+        Check whether an outcome is one of the CUBE_FLAGS, so that the cube can count it.
+        """
+        return outcome in CUBE_FLAGS
+
+    def court_outcomes(self, start_date: DateLike, end_date: DateLike, outcome: str) -> pd.DataFrame:
+        """
+        Count an outcome per court and broad case type within whole months, see `analysis.analyze_court_outcomes`.
+
+        Raises:
+            ValueError: If the outcome is not one of the CUBE_FLAGS or the window does not cover whole months.
+        """
+        if not self.holds_outcome(outcome):
+            raise ValueError(f"The aggregate cube only counts the outcomes {', '.join(CUBE_FLAGS)}, not '{outcome}'")
+        if not self.is_month_aligned(start_date, end_date):
+            raise ValueError("The aggregate cube only answers windows of whole months")
+        cells = self.cells
+        months = cells['month']
+        in_period = (months >= pd.Timestamp(start_date).to_period('M').start_time) & (months <= pd.Timestamp(end_date).to_period('M').start_time)
+        # Floats, as analysis.analyze_court_outcomes returns
+        return crosstab(cells['court'], cells['broad_case_type'], cells[outcome], (in_period & (cells[outcome] > 0)).to_numpy()).astype(float)
+
+    def productivity(self) -> pd.DataFrame:
+        """
+        Count merit and non-merit conclusions per court, see `analysis.get_productivity`.
+        """
+        cells = self.cells
+        table = crosstab(cells['court'], cells['outcome_class'], cells['rows'], (cells['outcome_class'] != 'open').to_numpy())
+        table.columns = pd.Index([{'merit': 'Merit', 'non-merit': 'Non_Merit'}[label] for label in table.columns], name='productivity_category')
+        return table
+
+    def monthly_case_stats(self) -> pd.DataFrame:
+        """
+        Sum registered and concluded activities per court, month name and case type, see `analysis.get_monthly_case_stats`.
+        """
+        return self.aggregate(['court', 'date_mon', 'case_type'], ['registered', 'concluded'])
+
+    def adjournment_proportion(self) -> pd.DataFrame:
+        """
+        Sum adjourned and adjournable activities per court with their ratio, see `analysis.calculate_adjournment_proportion`.
+        """
+        totals = self.aggregate(['court'], ['adjourned', 'adjournable']).rename(columns={'adjourned': 'total_adjourned', 'adjournable': 'total_adjournable'})
+        totals['adjourn_proportion'] = (totals['total_adjourned'] / totals['total_adjournable']) * 100
+        return totals
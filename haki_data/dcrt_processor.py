@@ -1,9 +1,19 @@
 import argparse
+import hashlib
+import json
 import logging
 import os
+import shutil
 import pandas as pd
-from multiprocessing import Pool
-from typing import List, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from haki_data.dedup import RowDeduplicator
+from haki_data.manifest import IngestManifest, file_signature, content_hash
+from haki_data.scheduler import FileScheduler, DEFAULT_MEMORY_FACTOR
+from haki_data.sidecar_cache import SidecarCache, DEFAULT_MAX_BYTES
+from haki_data.utils import apply_schema, dataset_partitioning, month_number
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -20,7 +30,30 @@ COLUMN_NAMES: List[str] = [
     "applicant_witness", "defendant_witness", "custody", "other_details"
 ]
 
-def generate_file_paths(root_folder: str, is_api_data: bool, start_year: Optional[int] = None, end_year: Optional[int] = None) -> List[str]:
+# Column order of the processed output, with the court first and the line number dropped
+OUTPUT_COLUMNS: List[str] = ['court_name'] + COLUMN_NAMES[1:]
+
+# Second partition level of the Parquet dataset output, after the court
+PARTITION_COLUMNS: Dict[str, str] = {'filed_year': 'filed_yyyy', 'activity_month': 'activity_month'}
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+def court_name_from_path(file_path: str, is_api_data: bool) -> str:
+    """
+    Derive the court name from an Excel file path.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        is_api_data (bool): Flag indicating if the data is from API (court name prefixes the file name) or not (court folder).
+
+    Returns:
+        str: The raw court name.
+    """
+    if is_api_data:
+        return os.path.basename(file_path).split("-")[0].strip()
+    path_components = os.path.normpath(file_path).split(os.sep)
+    return path_components[-4].strip()
+
+def generate_file_paths(root_folder: str, is_api_data: bool, start_year: Optional[int] = None, end_year: Optional[int] = None, courts: Optional[List[str]] = None) -> List[str]:
     """
     Generate a list of file paths for Excel files based on the data type and year range.
 
@@ -29,6 +62,7 @@ def generate_file_paths(root_folder: str, is_api_data: bool, start_year: Optiona
         is_api_data (bool): Flag indicating if the data is from API (flat structure) or not (hierarchical structure).
         start_year (Optional[int]): The start year for file processing (for non-API data).
         end_year (Optional[int]): The end year for file processing (for non-API data).
+        courts (Optional[List[str]]): Raw court names to keep; files of other courts are skipped without being opened.
 
     Returns:
         List[str]: A list of file paths for the relevant Excel files.
@@ -50,59 +84,313 @@ def generate_file_paths(root_folder: str, is_api_data: bool, start_year: Optiona
                     except ValueError:
                         logger.warning(f"Skipping file due to invalid year format: {file_path}")
                         continue
+    if courts is not None:
+        courts = set(courts)
+        file_paths = [path for path in file_paths if court_name_from_path(path, is_api_data) in courts]
     logger.info(f"Found {len(file_paths)} Excel files to process")
     return file_paths
 
-def process_file(file_path: str, is_api_data: bool) -> pd.DataFrame:
+def read_workbook(file_path: str, is_api_data: bool, cache: Optional[SidecarCache] = None) -> pd.DataFrame:
+    """
+    Read a single Excel file, add the court name derived from its path and cast it to COLUMN_DTYPES.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        cache (Optional[SidecarCache]): Sidecar cache consulted before parsing the workbook and filled after.
+
+    Returns:
+        pd.DataFrame: The workbook data with a 'court_name' column.
+
+    Raises:
+        Exception: Any error raised while reading the workbook.
+    """
+    if cache is not None:
+        df = cache.get(file_path)
+        if df is not None:
+            logger.info(f"Loaded cached parse of file: {file_path}")
+            return apply_schema(df)
+
+    logger.info(f"Processing file: {file_path}")
+    court_name = court_name_from_path(file_path, is_api_data)
+
+    df = pd.read_excel(file_path, header=4, names=COLUMN_NAMES)
+    df = apply_schema(df.assign(court_name=court_name).drop(df.columns[0], axis=1))
+    if cache is not None:
+        cache.put(file_path, df)
+    return df
+
+def process_file(file_path: str, is_api_data: bool, cache: Optional[SidecarCache] = None) -> pd.DataFrame:
     """
     Process a single Excel file, extracting the court name and relevant data.
 
     Args:
         file_path (str): The path to the Excel file.
         is_api_data (bool): Flag indicating if the data is from API or not.
+        cache (Optional[SidecarCache]): Sidecar cache consulted before parsing the workbook and filled after.
 
     Returns:
         pd.DataFrame: A DataFrame containing the processed data, or an empty DataFrame if an error occurred.
     """
     try:
-        logger.info(f"Processing file: {file_path}")
-        if is_api_data:
-            court_name = os.path.basename(file_path).split("-")[0].strip()
-        else:
-            path_components = os.path.normpath(file_path).split(os.sep)
-            court_name = path_components[-4].strip()
-            
-        df = pd.read_excel(file_path, header=4, names=COLUMN_NAMES)
-        df = df.assign(court_name=court_name).drop(df.columns[0], axis=1)
+        df = read_workbook(file_path, is_api_data, cache)
         logger.info(f"Successfully processed file: {file_path}")
         return df
     except Exception as e:
         logger.error(f"Error processing file {file_path}: {e}")
         return pd.DataFrame()
 
-def process_files(file_paths: List[str], is_api_data: bool) -> pd.DataFrame:
+def process_files(file_paths: List[str], is_api_data: bool, cache: Optional[SidecarCache] = None, scheduler: Optional[FileScheduler] = None) -> pd.DataFrame:
     """
     Read and process Excel files from a list of paths using multiple processes.
 
     Args:
         file_paths (List[str]): A list of file paths to process.
         is_api_data (bool): Flag indicating if the data is from API or not.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+        scheduler (Optional[FileScheduler]): Executor for the per-file work. Defaults to one with no timeout or retries.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the combined data from all processed files.
+        pd.DataFrame: A DataFrame containing the combined data from all processed files, in the order of `file_paths`.
     """
+    scheduler = scheduler or FileScheduler()
     logger.info("Starting multiprocessing for file processing")
-    with Pool() as pool:
-        results = pool.starmap(process_file, [(path, is_api_data) for path in file_paths])
-    
+    results = {record['path']: record['result'] for record in scheduler.run(read_workbook, file_paths, is_api_data, cache)}
+    if cache is not None:
+        cache.evict()
+
+    frames = [results[path] for path in file_paths if results.get(path) is not None]
+    combined_df = pd.concat([df for df in frames if not df.empty], ignore_index=True)
+    logger.info(f"Combined {len(frames)} DataFrames, total rows: {len(combined_df)}")
+    return combined_df
+
+def read_workbook_with_signature(file_path: str, is_api_data: bool, cache: Optional[SidecarCache] = None) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """
+    Read a single Excel file, capturing its manifest signature before it is read.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+
+    Returns:
+        Tuple[Dict[str, Any], pd.DataFrame]: The file's size/mtime/hash signature and its data.
+    """
+    signature = {**file_signature(file_path), 'sha256': content_hash(file_path)}
+    return signature, read_workbook(file_path, is_api_data, cache)
+
+def iter_processed_files(file_paths: List[str], is_api_data: bool, manifest: Optional[IngestManifest] = None, cache: Optional[SidecarCache] = None, scheduler: Optional[FileScheduler] = None, dedup: Optional[RowDeduplicator] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the DataFrame of each Excel file as soon as it is available.
+
+    Files unchanged since they were recorded in the manifest are served from their previously
+    parsed output first. The remaining files are parsed by the scheduler and yielded in
+    completion order; each one is recorded in the manifest as it completes, so an interrupted
+    run resumes from there. With `dedup`, rows already yielded for an earlier file are dropped
+    after the file is recorded, so the manifest keeps each file's full output.
+
+    Args:
+        file_paths (List[str]): A list of file paths to process.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        manifest (Optional[IngestManifest]): The manifest of previously parsed files.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+        scheduler (Optional[FileScheduler]): Executor for the per-file work. Defaults to one with no timeout or retries.
+        dedup (Optional[RowDeduplicator]): Drops rows seen in earlier files.
+
+    Yields:
+        pd.DataFrame: The data of one file. Files that fail are logged and skipped.
+    """
+    scheduler = scheduler or FileScheduler()
+    pending = file_paths
+    if manifest is not None:
+        partitioned = manifest.partition(file_paths)
+        pending = partitioned['pending']
+        for path in partitioned['unchanged']:
+            df = manifest.load_output(path)
+            yield dedup.drop_duplicates(df, path) if dedup is not None else df
+
+    if pending:
+        logger.info(f"Starting multiprocessing for {len(pending)} files")
+        for record in scheduler.run(read_workbook_with_signature, pending, is_api_data, cache):
+            # Failed files are left out of the manifest so the next run retries them
+            if record['error']:
+                continue
+            signature, df = record['result']
+            if manifest is not None:
+                manifest.record(record['path'], signature, df)
+            yield dedup.drop_duplicates(df, record['path']) if dedup is not None else df
+
+    if manifest is not None:
+        manifest.save()
+    if cache is not None:
+        cache.evict()
+
+def process_files_incremental(file_paths: List[str], is_api_data: bool, manifest: IngestManifest, cache: Optional[SidecarCache] = None, scheduler: Optional[FileScheduler] = None) -> pd.DataFrame:
+    """
+    Process Excel files, parsing only those that changed since they were recorded in the manifest.
+
+    Args:
+        file_paths (List[str]): A list of file paths to process.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        manifest (IngestManifest): The manifest of previously parsed files.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+        scheduler (Optional[FileScheduler]): Executor for the per-file work.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing the combined data from all files.
+    """
+    results = list(iter_processed_files(file_paths, is_api_data, manifest, cache, scheduler))
     combined_df = pd.concat([df for df in results if not df.empty], ignore_index=True)
     logger.info(f"Combined {len(results)} DataFrames, total rows: {len(combined_df)}")
     return combined_df
 
+def process_files_streaming(file_paths: List[str], is_api_data: bool, output_file: str, manifest: Optional[IngestManifest] = None, cache: Optional[SidecarCache] = None, partition_by: Optional[str] = None, scheduler: Optional[FileScheduler] = None, dedup: Optional[RowDeduplicator] = None) -> int:
+    """
+    Process Excel files and append each one to the output as soon as it completes.
+
+    Each file is normalized with `process_dataframe` on its own and written straight away,
+    so memory is bounded by the files in flight instead of the whole corpus. Rows are written
+    in completion order.
+
+    Args:
+        file_paths (List[str]): A list of file paths to process.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        output_file (str): The output CSV file path, or the dataset directory when `partition_by` is set.
+        manifest (Optional[IngestManifest]): The manifest of previously parsed files.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+        partition_by (Optional[str]): Write a partitioned Parquet dataset instead of a CSV, see `write_partitioned_dataset`.
+        scheduler (Optional[FileScheduler]): Executor for the per-file work.
+        dedup (Optional[RowDeduplicator]): Drops rows already written for an earlier file.
+
+    Returns:
+        int: The number of rows written.
+    """
+    frames = iter_processed_files(file_paths, is_api_data, manifest, cache, scheduler, dedup)
+    if partition_by is not None:
+        shutil.rmtree(output_file, ignore_errors=True)
+        total_rows = 0
+        for part, df in enumerate(frames):
+            if df.empty:
+                continue
+            df = process_dataframe(df)
+            write_partitioned_dataset(df, output_file, partition_by, part=part)
+            total_rows += len(df)
+        logger.info(f"Streamed {total_rows} rows to {output_file}")
+        return total_rows
+
+    columns: Optional[List[str]] = None
+    total_rows = 0
+    with open(output_file, 'w', newline='') as f:
+        for df in frames:
+            if df.empty:
+                continue
+            df = process_dataframe(df)
+            if columns is None:
+                columns = list(df.columns)
+                df.to_csv(f, index=False)
+            else:
+                df.reindex(columns=columns).to_csv(f, index=False, header=False)
+            total_rows += len(df)
+    logger.info(f"Streamed {total_rows} rows to {output_file}")
+    return total_rows
+
+def write_shard(file_path: str, is_api_data: bool, staging_dir: str, cache: Optional[SidecarCache] = None) -> Dict[str, Any]:
+    """
+    Process a single Excel file in a worker and write the result to a CSV shard.
+
+    The per-file part of `process_dataframe` runs in the worker and the shard columns follow
+    OUTPUT_COLUMNS, so shards can be concatenated byte for byte by `merge_shards`.
+
+    Args:
+        file_path (str): The path to the Excel file.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        staging_dir (str): Directory the shard is written to.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+
+    Returns:
+        Dict[str, Any]: The 'shard' path and the number of 'rows' written.
+    """
+    df = process_dataframe(read_workbook(file_path, is_api_data, cache)).reindex(columns=OUTPUT_COLUMNS)
+    shard = os.path.join(staging_dir, f"{hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()}.csv")
+    df.to_csv(shard, index=False)
+    return {'shard': shard, 'rows': len(df)}
+
+def process_files_to_shards(file_paths: List[str], is_api_data: bool, staging_dir: str, cache: Optional[SidecarCache] = None, scheduler: Optional[FileScheduler] = None) -> List[Dict[str, Any]]:
+    """
+    Process Excel files in a process pool where each worker writes its own shard.
+
+    Only the small metadata records travel back to the parent, never the DataFrames.
+
+    Args:
+        file_paths (List[str]): A list of file paths to process.
+        is_api_data (bool): Flag indicating if the data is from API or not.
+        staging_dir (str): Directory the shards are written to.
+        cache (Optional[SidecarCache]): Sidecar cache of previously parsed workbooks.
+        scheduler (Optional[FileScheduler]): Executor for the per-file work.
+
+    Returns:
+        List[Dict[str, Any]]: One record per file with its 'path', 'shard' (None on failure), 'rows', 'duration' in seconds and 'error'.
+    """
+    scheduler = scheduler or FileScheduler()
+    os.makedirs(staging_dir, exist_ok=True)
+    logger.info(f"Starting multiprocessing for {len(file_paths)} files, shards in {staging_dir}")
+    records = []
+    for record in scheduler.run(write_shard, file_paths, is_api_data, staging_dir, cache):
+        shard = record['result'] or {'shard': None, 'rows': 0}
+        records.append({'path': record['path'], **shard, 'duration': record['duration'], 'error': record['error']})
+    if cache is not None:
+        cache.evict()
+
+    failed = [record for record in records if record['error']]
+    logger.info(f"Wrote {len(records) - len(failed)} shards, {sum(record['rows'] for record in records)} rows, {len(failed)} failures")
+    return records
+
+def merge_shards(records: List[Dict[str, Any]], output_file: str, remove: bool = True, dedup: Optional[RowDeduplicator] = None) -> int:
+    """
+    Concatenate CSV shards into the output file without loading them into DataFrames.
+
+    The header of the first shard is kept and the header line of every other shard is skipped;
+    the rest is copied as raw bytes. With `dedup`, each shard is read as text instead and rows
+    already merged from an earlier shard are dropped.
+
+    Args:
+        records (List[Dict[str, Any]]): Metadata records from `process_files_to_shards`.
+        output_file (str): The output CSV file path.
+        remove (bool): Whether to delete each shard once it has been merged.
+        dedup (Optional[RowDeduplicator]): Drops rows seen in earlier shards.
+
+    Returns:
+        int: The number of data rows in the merged output.
+    """
+    shard_records = sorted((record for record in records if record['shard']), key=lambda record: record['shard'])
+    total_rows = 0
+    with open(output_file, 'wb') as out:
+        for i, record in enumerate(shard_records):
+            with open(record['shard'], 'rb') as f:
+                if dedup is None:
+                    header = f.readline()
+                    if i == 0:
+                        out.write(header)
+                    shutil.copyfileobj(f, out)
+                    total_rows += record['rows']
+                else:
+                    # Read as text so the fingerprints and the written values match the shard exactly
+                    df = dedup.drop_duplicates(pd.read_csv(f, dtype=str, keep_default_na=False), record['path'])
+                    out.write(df.to_csv(index=False, header=i == 0).encode())
+                    total_rows += len(df)
+            if remove:
+                os.remove(record['shard'])
+    logger.info(f"Merged {len(shard_records)} shards into {output_file}, total rows: {total_rows}")
+    return total_rows
+
 def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """
     Process the combined DataFrame by filling NaN values and reordering columns.
 
+    The declared schema is re-applied first, since concatenating frames whose categoricals
+    have different categories falls back to object columns. Missing values in the small
+    integer columns are filled with 0 without widening their dtype.
+
     Args:
         df (pd.DataFrame): Input DataFrame to process.
 
@@ -110,15 +398,91 @@ def process_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         pd.DataFrame: Processed DataFrame.
     """
     logger.info("Processing combined DataFrame")
+    df = apply_schema(df)
     float_columns = df.select_dtypes(include=['float64']).columns
     df[float_columns] = df[float_columns].fillna(0).astype(int)
-    logger.info(f"Filled NaN values in {len(float_columns)} float columns and converted to int")
+    int_columns = df.select_dtypes(include=['Int8', 'Int16', 'Int32', 'Int64']).columns
+    df[int_columns] = df[int_columns].fillna(0)
+    logger.info(f"Filled NaN values in {len(float_columns)} float columns and {len(int_columns)} integer columns")
 
     # Ensure 'court' is the first column
     df = df[['court_name'] + [col for col in df.columns if col != 'court_name']]
     logger.info("DataFrame processing completed")
     return df
 
+def add_activity_month(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add an 'activity_month' column in YYYY-MM form built from the activity date parts.
+
+    Args:
+        df (pd.DataFrame): DataFrame with 'date_yyyy' and 'date_mon' columns.
+
+    Returns:
+        pd.DataFrame: The DataFrame with a categorical 'activity_month' column, null where the month is invalid.
+    """
+    year = df['date_yyyy'].astype('Int32')
+    month = month_number(df['date_mon']).astype('Int32')
+    key = (year * 100 + month).where(year > 0)
+    codes, uniques = pd.factorize(key)
+    labels = [f"{value // 100:04d}-{value % 100:02d}" for value in uniques]
+    df['activity_month'] = pd.Categorical.from_codes(codes, categories=pd.Index(labels, dtype=object))
+    return df
+
+def write_partitioned_dataset(df: pd.DataFrame, output_dir: str, partition_by: str = 'activity_month', part: int = 0, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> None:
+    """
+    Write processed data as a Hive-style partitioned Parquet dataset.
+
+    Files are laid out as `court_name=<court>/<partition column>=<value>/`. Rows are sorted by
+    court, partition and activity date before writing so the min/max statistics of each row
+    group cover narrow date ranges.
+
+    Args:
+        df (pd.DataFrame): The processed DataFrame.
+        output_dir (str): The root directory of the dataset.
+        partition_by (str): 'activity_month' or 'filed_year'.
+        part (int): Number used in the file names, so successive calls add files instead of replacing them.
+        row_group_size (int): Maximum number of rows per Parquet row group.
+    """
+    partition_column = PARTITION_COLUMNS[partition_by]
+    if partition_column == 'activity_month':
+        df = add_activity_month(df)
+    partition_columns = ['court_name', partition_column]
+
+    sort_keys = df[partition_columns + ['date_yyyy', 'date_dd']].assign(date_mon=month_number(df['date_mon']))
+    order = sort_keys.sort_values(partition_columns + ['date_yyyy', 'date_mon', 'date_dd']).index
+    table = pa.Table.from_pandas(df.loc[order], preserve_index=False)
+
+    ds.write_dataset(
+        table,
+        output_dir,
+        format='parquet',
+        partitioning=dataset_partitioning(partition_columns),
+        basename_template=f"part-{part}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, len(table)),
+        file_options=ds.ParquetFileFormat().make_write_options(write_statistics=True),
+    )
+    logger.info(f"Wrote {len(table)} rows to partitioned dataset {output_dir} by {partition_columns}")
+
+def log_run_report(report: Dict[str, Any], report_file: Optional[str] = None) -> None:
+    """
+    Log the scheduler run report and optionally save it as JSON.
+
+    Args:
+        report (Dict[str, Any]): The report from `FileScheduler.report`.
+        report_file (Optional[str]): Path of the JSON file to write.
+    """
+    logger.info(f"Run report: {report['files']} files in {report['wall_time']:.1f}s, {report['failed']} failed, {report['retried']} retried, "
+                f"peak estimated memory {report['peak_memory'] / 1024 ** 2:.0f} MB")
+    for record in report['slowest']:
+        logger.info(f"  slow: {record['path']} ({record['size']} bytes) took {record['duration']:.1f}s")
+    for record in report['failures']:
+        logger.error(f"  failed: {record['path']} after {record['attempts']} attempts: {record['error']}")
+    if report_file:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
 def main(args: argparse.Namespace) -> None:
     """
     Main function to orchestrate the data processing workflow.
@@ -128,16 +492,42 @@ def main(args: argparse.Namespace) -> None:
     """
     try:
         logger.info("Starting main processing function")
-        file_paths = generate_file_paths(args.root_folder, args.is_api_data, args.start_year, args.end_year)
+        file_paths = generate_file_paths(args.root_folder, args.is_api_data, args.start_year, args.end_year, args.courts)
         if not file_paths:
             raise ValueError("No Excel files found in the specified folder or year range.")
 
-        combined_df = process_files(file_paths, args.is_api_data)
-        processed_df = process_dataframe(combined_df)
-        
-        processed_df.to_csv(args.output_file, index=False)
+        cache = SidecarCache(args.cache_dir, args.cache_max_mb * 1024 ** 2) if args.cache_dir else None
+        manifest = IngestManifest(args.state_dir) if args.state_dir else None
+        memory_budget = args.memory_budget_mb * 1024 ** 2 if args.memory_budget_mb else None
+        scheduler = FileScheduler(args.processes, args.timeout, args.retries, memory_budget, args.memory_factor)
+        dedup = RowDeduplicator(args.dedup_columns, args.dedup_bloom_mb * 8 * 1024 ** 2 if args.dedup_bloom_mb else None) if args.dedup else None
+        partition_by = args.partition_by if args.output_format == 'parquet' else None
+
+        if args.staging_dir:
+            records = process_files_to_shards(file_paths, args.is_api_data, args.staging_dir, cache, scheduler)
+            total_rows = merge_shards(records, args.output_file, dedup=dedup)
+        elif args.stream:
+            total_rows = process_files_streaming(file_paths, args.is_api_data, args.output_file, manifest, cache, partition_by, scheduler, dedup)
+        else:
+            if manifest is not None:
+                combined_df = process_files_incremental(file_paths, args.is_api_data, manifest, cache, scheduler)
+            else:
+                combined_df = process_files(file_paths, args.is_api_data, cache, scheduler)
+            processed_df = process_dataframe(combined_df)
+
+            if partition_by is not None:
+                shutil.rmtree(args.output_file, ignore_errors=True)
+                write_partitioned_dataset(processed_df, args.output_file, partition_by)
+            else:
+                processed_df.to_csv(args.output_file, index=False)
+            total_rows = len(processed_df)
         logger.info(f"Processed data saved to {args.output_file}")
-        logger.info(f"Total rows processed: {len(processed_df)}")
+        logger.info(f"Total rows processed: {total_rows}")
+        report = scheduler.report()
+        if dedup is not None:
+            report['duplicates'] = dedup.report()
+            logger.info(f"Dropped {sum(counts['duplicates'] for counts in report['duplicates'].values())} duplicate rows at ingest")
+        log_run_report(report, args.report_file)
     except Exception as e:
         logger.error(f"An error occurred during data processing: {e}")
         raise
@@ -145,14 +535,37 @@ def main(args: argparse.Namespace) -> None:
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process court data from Excel files.")
     parser.add_argument('root_folder', type=str, help='Root folder containing Excel files')
-    parser.add_argument('output_file', type=str, help='Output CSV file path')
+    parser.add_argument('output_file', type=str, help='Output CSV file path, or dataset directory for Parquet output')
     parser.add_argument('--is_api_data', action='store_true', help='Flag to indicate if data is from API (flat structure)')
     parser.add_argument('--start_year', type=int, help='Start year for file processing (required for non-API data)')
     parser.add_argument('--end_year', type=int, help='End year for file processing (required for non-API data)')
+    parser.add_argument('--courts', nargs='+', help='Only process files of these courts (court folder or file name prefix)')
+    parser.add_argument('--state_dir', type=str, help='Directory for the ingest manifest; unchanged files are not re-parsed')
+    parser.add_argument('--stream', action='store_true', help='Append each file to the output as it completes instead of combining in memory')
+    parser.add_argument('--staging_dir', type=str, help='Directory where workers write per-file shards that are merged into the output')
+    parser.add_argument('--output_format', choices=['csv', 'parquet'], default='csv', help='Write a single CSV or a partitioned Parquet dataset')
+    parser.add_argument('--partition_by', choices=list(PARTITION_COLUMNS), default='activity_month', help='Partition level below the court for Parquet output')
+    parser.add_argument('--dedup', action='store_true', help='Drop rows repeated across files while streaming or merging shards')
+    parser.add_argument('--dedup_columns', nargs='+', help='Columns identifying a row for --dedup (default: all columns)')
+    parser.add_argument('--dedup_bloom_mb', type=int, help='Size in MB of a Bloom filter in front of the --dedup fingerprint index')
+    parser.add_argument('--processes', type=int, help='Number of worker processes (default: CPU count)')
+    parser.add_argument('--timeout', type=float, help='Seconds allowed per file attempt')
+    parser.add_argument('--retries', type=int, default=0, help='Times a failed or timed out file is retried')
+    parser.add_argument('--memory_budget_mb', type=int, help='Memory in MB the files being parsed at once may use (default: no limit)')
+    parser.add_argument('--memory_factor', type=float, default=DEFAULT_MEMORY_FACTOR, help='Estimated parse memory per byte of workbook size')
+    parser.add_argument('--report_file', type=str, help='Write the run report (slowest files, failures) to this JSON file')
+    parser.add_argument('--cache_dir', type=str, help='Directory for Parquet sidecars of parsed workbooks')
+    parser.add_argument('--cache_max_mb', type=int, default=DEFAULT_MAX_BYTES // 1024 ** 2, help='Size cap of the sidecar cache in MB')
 
     args = parser.parse_args()
 
     if not args.is_api_data and (args.start_year is None or args.end_year is None):
         parser.error("--start_year and --end_year are required for non-API data processing")
+    if args.staging_dir and args.output_format == 'parquet':
+        parser.error("--staging_dir merges CSV shards and cannot be combined with --output_format parquet")
+    if args.staging_dir and args.state_dir:
+        parser.error("--staging_dir does not record files in the ingest manifest; use --stream with --state_dir to resume interrupted runs")
+    if args.dedup and not (args.stream or args.staging_dir):
+        parser.error("--dedup applies to --stream and --staging_dir; batch runs are deduplicated by clean_data")
 
     main(args)
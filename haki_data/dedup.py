@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+from . logging_config import logger
+
+BLOOM_HASHES = 4
+
+
+class BloomFilter:
+    """
+    Bloom filter over 64-bit row fingerprints, backed by a numpy bit array.
+
+    The `BLOOM_HASHES` bit positions of a fingerprint are derived from its two 32-bit halves
+    by double hashing, so no rehashing of the rows is needed.
+
+    Args:
+        num_bits (int): Size of the filter in bits, rounded up to a multiple of 8.
+    """
+
+    def __init__(self, num_bits: int) -> None:
+        self.num_bits = max(8, -(-num_bits // 8) * 8)
+        self.bits = np.zeros(self.num_bits // 8, dtype=np.uint8)
+
+    def _positions(self, fingerprints: np.ndarray) -> np.ndarray:
+        low = fingerprints & np.uint64(0xFFFFFFFF)
+        high = fingerprints >> np.uint64(32)
+        steps = np.arange(BLOOM_HASHES, dtype=np.uint64)[:, None]
+        return (low + steps * high) % np.uint64(self.num_bits)
+
+    def add(self, fingerprints: np.ndarray) -> None:
+        """
+        Add fingerprints to the filter.
+
+        Args:
+            fingerprints (np.ndarray): uint64 fingerprints.
+        """
+        positions = self._positions(fingerprints).ravel()
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    def might_contain(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        Test fingerprints for membership. False positives are possible, false negatives are not.
+
+        Args:
+            fingerprints (np.ndarray): uint64 fingerprints.
+
+        Returns:
+            np.ndarray: Boolean mask of the fingerprints that may have been added.
+        """
+        positions = self._positions(fingerprints)
+        set_bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return set_bits.all(axis=0).astype(bool)
+
+
+class RowDeduplicator:
+    """
+    Drop rows already seen in earlier batches, keeping only 8 bytes per distinct row.
+
+    Each row's key columns are hashed with `pd.util.hash_pandas_object` into a 64-bit
+    fingerprint. Fingerprints of the rows kept so far are held in a sorted numpy array,
+    looked up with `np.searchsorted` and merged into with `np.insert`, so a batch costs a pass
+    over the array rather than a sort of it. With `bloom_bits`, a Bloom filter in front of the array
+    lets rows that are certainly new skip the lookup.
+
+    Two distinct rows sharing a fingerprint would be treated as duplicates; with 64-bit
+    fingerprints this is negligible below billions of rows.
+
+    Args:
+        key_columns (Optional[List[str]]): Columns identifying a row. Defaults to all columns.
+        bloom_bits (Optional[int]): Size of the Bloom filter in bits. Defaults to no filter.
+    """
+
+    def __init__(self, key_columns: Optional[List[str]] = None, bloom_bits: Optional[int] = None) -> None:
+        self.key_columns = key_columns
+        self.bloom = BloomFilter(bloom_bits) if bloom_bits else None
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.counts: Dict[str, Dict[str, int]] = {}
+
+    def fingerprint(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Hash the key columns of each row into a 64-bit fingerprint.
+
+        Columns are hashed in name order, so batches with differently ordered columns agree.
+
+        Args:
+            df (pd.DataFrame): The rows to hash.
+
+        Returns:
+            np.ndarray: One uint64 fingerprint per row.
+        """
+        columns = self.key_columns if self.key_columns is not None else sorted(df.columns)
+        return pd.util.hash_pandas_object(df.reindex(columns=columns), index=False).to_numpy()
+
+    def _contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(fingerprints), dtype=bool)
+        candidates = self.bloom.might_contain(fingerprints) if self.bloom is not None else np.ones(len(fingerprints), dtype=bool)
+        if len(self.seen) and candidates.any():
+            lookup = fingerprints[candidates]
+            # Sorted queries walk the array in order instead of jumping around it
+            order = np.argsort(lookup)
+            positions = np.minimum(np.searchsorted(self.seen, lookup[order]), len(self.seen) - 1)
+            hits = np.empty(len(lookup), dtype=bool)
+            hits[order] = self.seen[positions] == lookup[order]
+            found[candidates] = hits
+        return found
+
+    def drop_duplicates(self, df: pd.DataFrame, source: str = '') -> pd.DataFrame:
+        """
+        Drop rows seen in earlier batches or earlier in this batch, and remember the rest.
+
+        Args:
+            df (pd.DataFrame): A batch of rows, e.g. one file.
+            source (str): Name of the batch the duplicate counts are reported under.
+
+        Returns:
+            pd.DataFrame: The rows not seen before, in their original order.
+        """
+        fingerprints = self.fingerprint(df)
+        duplicate = pd.Series(fingerprints).duplicated().to_numpy() | self._contains(fingerprints)
+        new = np.sort(fingerprints[~duplicate])
+        # Merge the sorted new fingerprints in, a linear pass, instead of re-sorting all those seen
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, new), new)
+        if self.bloom is not None:
+            self.bloom.add(new)
+
+        counts = self.counts.setdefault(source, {'rows': 0, 'duplicates': 0})
+        counts['rows'] += len(df)
+        counts['duplicates'] += int(duplicate.sum())
+        if duplicate.any():
+            logger.info(f"Dropped {int(duplicate.sum())} of {len(df)} rows of {source} as duplicates")
+        return df.take(np.flatnonzero(~duplicate))
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the rows and duplicates seen per source.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Per source, the number of 'rows' and of 'duplicates' dropped.
+        """
+        return self.counts
@@ -0,0 +1,49 @@
+import pandas as pd
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from . constants import DATE_PARTS
+from . rules import default_engine
+from . taxonomy import get_taxonomy
+from . utils import add_case_number, assemble_dates
+from . analysis import add_case_age
+
+
+class DerivedColumn(NamedTuple):
+    """
+    A column computed from other columns, raw or derived.
+    """
+    inputs: List[str]
+    compute: Callable[[pd.DataFrame], pd.Series]
+
+
+def _date(column: str) -> DerivedColumn:
+    year, month, day = DATE_PARTS[column]
+    return DerivedColumn([year, month, day], lambda df: assemble_dates(df[year], df[month], df[day])[0])
+
+
+def _rule(column: str, inputs: List[str], dtype: Optional[str] = None) -> DerivedColumn:
+    rules = default_engine()
+
+    def compute(df: pd.DataFrame) -> pd.Series:
+        values = pd.Series(rules.evaluate(df, column), index=df.index)
+        return values.astype(dtype) if dtype else values
+    return DerivedColumn(inputs, compute)
+
+
+DERIVED_COLUMNS: Dict[str, DerivedColumn] = {
+    'activity_date': _date('activity_date'),
+    'filed_date': _date('filed_date'),
+    'next_date': _date('next_date'),
+    'case_number': DerivedColumn(['court', 'caseid_type', 'caseid_no', 'filed_yyyy'], lambda df: add_case_number(df.copy(deep=False), 'court', 'caseid_type', 'caseid_no', 'filed_yyyy')['case_number']),
+    'case_age': DerivedColumn(['activity_date', 'filed_date'], lambda df: add_case_age(df.copy(deep=False))['case_age']),
+    'nature': DerivedColumn(['case_type'], lambda df: get_taxonomy().nature(df['case_type'])),
+    'broad_case_type': DerivedColumn(['case_type'], lambda df: get_taxonomy().broad_case_type(df['case_type'])),
+    'concluded': DerivedColumn(['outcome'], lambda df: get_taxonomy().concluded(df['outcome'])),
+    'merit': DerivedColumn(['outcome'], lambda df: get_taxonomy().merit(df['outcome'])),
+    'registered': _rule('registered', ['outcome', 'activity_date', 'filed_date']),
+    'productivity_category': _rule('productivity_category', ['merit', 'concluded']),
+    'hearing': _rule('hearing', ['comingfor']),
+    # Integer flags, as added by analysis.calculate_adjournment_proportion
+    'adjournable': _rule('adjournable', ['comingfor'], 'int64'),
+    'adjourned': _rule('adjourned', ['reason_adj', 'adjournable'], 'int64'),
+}
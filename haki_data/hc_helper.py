@@ -1,8 +1,19 @@
+import json
+import os
+import re
+import numpy as np
 import pandas as pd
 import argparse
 import logging
+from typing import Dict, Optional
 
 from .constants import NAME_MAP 
+from .logging_config import logger
+
+# Court names kept whole instead of being shortened to their first word
+FULL_NAME_COURTS = ('Milimani',)
+REDUNDANT_PREFIX = re.compile(re.escape("High Court_High Court"), re.IGNORECASE)
+WHITESPACE = re.compile(r'\s+')
 
 
 def map_names(name: str) -> str:
@@ -21,31 +32,114 @@ def map_names(name: str) -> str:
     logger.debug(f"Mapped name: '{name}' to '{transformed_name}'")
     return transformed_name
 
-def transform_court_names(df: pd.DataFrame) -> pd.DataFrame:
+class CourtNameResolver:
+    """
+    Memoized mapping of raw DCRT court names to canonical court names.
+
+    The NAME_MAP substitutions are compiled into a single regular expression, and each
+    distinct raw name is resolved once: the name is mapped and shortened to its first word,
+    courts in FULL_NAME_COURTS keep the raw name, and the redundant 'High Court_High Court'
+    prefix and extra whitespace are removed. Resolved names are kept in a raw -> canonical
+    table which can be persisted to `table_path` and is reused by later runs as long as
+    NAME_MAP is unchanged.
+
+    Args:
+        name_map (Optional[Dict[str, str]]): Substrings to replace in raw names. Defaults to NAME_MAP.
+        table_path (Optional[str]): JSON file the mapping table is loaded from and saved to.
+    """
+
+    def __init__(self, name_map: Optional[Dict[str, str]] = None, table_path: Optional[str] = None) -> None:
+        self.name_map = dict(NAME_MAP if name_map is None else name_map)
+        self.table_path = table_path
+        # Longest keys first, so a key is never shadowed by one of its prefixes
+        keys = sorted(self.name_map, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(re.escape(key) for key in keys)) if keys else None
+        self.table: Dict[str, str] = {}
+        if table_path and os.path.exists(table_path):
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.table_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable court name table {self.table_path}: {e}")
+            return
+        if stored.get('name_map') != self.name_map:
+            logger.info(f"NAME_MAP changed since {self.table_path} was saved, resolving court names afresh")
+            return
+        self.table = stored.get('table', {})
+        logger.info(f"Loaded {len(self.table)} court names from {self.table_path}")
+
+    def save(self) -> None:
+        """
+        Write the mapping table to `table_path`, if one was given.
+        """
+        if not self.table_path:
+            return
+        tmp_path = f"{self.table_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'name_map': self.name_map, 'table': self.table}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.table_path)
+
+    def _compute(self, name: str) -> str:
+        mapped = self.pattern.sub(lambda match: self.name_map[match.group(0)], name) if self.pattern else name
+        words = mapped.split()
+        court = words[0] if words else ''
+        if court in FULL_NAME_COURTS:
+            court = name
+        return WHITESPACE.sub(' ', REDUNDANT_PREFIX.sub('', court)).strip()
+
+    def resolve(self, name: str) -> str:
+        """
+        Get the canonical court name of a raw court name.
+
+        Args:
+            name (str): The raw court name.
+
+        Returns:
+            str: The canonical court name.
+        """
+        court = self.table.get(name)
+        if court is None:
+            court = self.table[name] = self._compute(name)
+        return court
+
+    def resolve_series(self, series: pd.Series) -> pd.Series:
+        """
+        Resolve a column of raw court names, looking up each distinct name once.
+
+        Args:
+            series (pd.Series): Raw court names.
+
+        Returns:
+            pd.Series: Categorical canonical court names, with sorted categories so that court-indexed
+                outputs do not depend on the input row order. Missing raw names stay missing.
+        """
+        codes, uniques = pd.factorize(series)
+        courts = pd.Series([self.resolve(str(name)) for name in uniques], dtype=object)
+        court_codes, categories = pd.factorize(courts, sort=True)
+        # The trailing -1 is picked up by the -1 code of missing values
+        court_codes = np.append(court_codes, -1)
+        return pd.Series(pd.Categorical.from_codes(court_codes[codes], categories=categories), index=series.index, name='court')
+
+def transform_court_names(df: pd.DataFrame, resolver: Optional[CourtNameResolver] = None) -> pd.DataFrame:
     """
     Apply a series of transformations to the court names in the DataFrame.
 
     Args:
         df (pd.DataFrame): DataFrame containing 'court_name' column.
+        resolver (Optional[CourtNameResolver]): Resolver holding the mapping table. Defaults to a fresh one.
 
     Returns:
-        pd.DataFrame: Transformed DataFrame with a new 'court' column.
+        pd.DataFrame: Transformed DataFrame with a new 'court' column, categorical if 'court_name' was.
     """
     logger.info("Starting court name transformation process")
-    
-    # Apply name mapping and create the 'court' column
-    df['court'] = df['court_name'].apply(map_names)
-    logger.info("Applied name mapping to 'court_name' column")
-
-    # Retain original 'court_name' for entries where 'court' is 'Milimani'
-    milimani_count = df.loc[df['court'] == 'Milimani'].shape[0]
-    df.loc[df['court'] == 'Milimani', 'court'] = df['court_name']
-    logger.info(f"Retained original 'court_name' for {milimani_count} entries with court as 'Milimani'")
-
-    # Remove redundant prefix and normalize whitespace
-    df['court'] = df['court'].str.replace("High Court_High Court", "", case=False, regex=False)
-    df['court'] = df['court'].str.replace(r'\s+', ' ', regex=True).str.strip()
-    logger.info("Removed redundant prefixes and normalized whitespace in 'court' column")
+    resolver = resolver or CourtNameResolver()
+    is_categorical = isinstance(df['court_name'].dtype, pd.CategoricalDtype)
+    court = resolver.resolve_series(df['court_name'])
+    df['court'] = court if is_categorical else court.astype(object)
+    logger.info(f"Resolved {court.cat.categories.size} courts from {df['court_name'].nunique()} distinct court names")
     df = df.drop(columns=['court_name'])
     logger.info("Court name transformation process completed")
     return df
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+from typing import List, NamedTuple, Optional
+
+from . logging_config import logger
+from . rules import default_engine
+from . utils import validate_columns
+
+# Stand-ins for "no date" in reductions over nanosecond timestamps; NaT is the int64 minimum
+_NO_EARLIEST = np.iinfo(np.int64).max
+_NO_LATEST = np.iinfo(np.int64).min
+_DAY = np.int64(86_400_000_000_000)
+
+# Case attributes taken from the first activity of each case, when present
+CASE_ATTRIBUTES: List[str] = ['court', 'case_type', 'broad_case_type', 'nature']
+
+
+class CaseSegments(NamedTuple):
+    """
+    An activity log sorted by case and activity date, with the boundaries of each case.
+
+    Attributes:
+        order (np.ndarray): Row positions of the log in sorted order.
+        starts (np.ndarray): Position in `order` of the first activity of each case.
+        case_numbers (pd.Index): The case number of each segment, sorted.
+    """
+    order: np.ndarray
+    starts: np.ndarray
+    case_numbers: pd.Index
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """
+        Number of activities per case.
+        """
+        return np.diff(np.append(self.starts, len(self.order)))
+
+
+def segment_cases(
+    df: pd.DataFrame,
+    case_column: str = 'case_number',
+    date_column: str = 'activity_date',
+    keep_undated: bool = False,
+) -> CaseSegments:
+    """
+    Sort the activity log by case and activity date once, and find where each case starts.
+
+    Activities without a case number are left out, and so are those without an activity date
+    unless `keep_undated` is set.
+
+    Args:
+        df (pd.DataFrame): The activity log.
+        case_column (str): The column identifying cases, see `utils.add_case_number`.
+        date_column (str): The activity date column.
+        keep_undated (bool): Keep activities without an activity date, after the dated activities of their case.
+
+    Returns:
+        CaseSegments: The sort order and segment boundaries.
+    """
+    codes, case_numbers = pd.factorize(df[case_column], sort=True)
+    dates = df[date_column].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    undated = dates == _NO_LATEST
+    valid = np.flatnonzero((codes >= 0) & (~undated | keep_undated))
+    if len(valid) < len(df):
+        logger.warning(f"Left {len(df) - len(valid)} activities without a case number or activity date out of the case table")
+    # lexsort is stable and sorts by its last key first; NaT, the smallest int64, is moved to the end
+    order = valid[np.lexsort((np.where(undated, _NO_EARLIEST, dates)[valid], codes[valid]))]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(order) else np.empty(0, dtype=np.intp)
+    return CaseSegments(order, starts, pd.Index(case_numbers[sorted_codes[starts]], name=case_column))
+
+
+def first_position(mask: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Find the first flagged position of each segment of a sorted array.
+
+    Args:
+        mask (np.ndarray): Flags, in segment order.
+        starts (np.ndarray): Start position of each segment, see `segment_cases`.
+
+    Returns:
+        np.ndarray: Per segment, the position of its first flagged entry, or `len(mask)` if none is flagged.
+    """
+    if not len(starts):
+        return np.empty(0, dtype=np.intp)
+    return np.minimum.reduceat(np.where(mask, np.arange(len(mask)), len(mask)), starts)
+
+
+def earliest(dates: np.ndarray, mask: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Get the earliest flagged date of each segment.
+
+    Args:
+        dates (np.ndarray): datetime64[ns] dates, in segment order.
+        mask (np.ndarray): Flags of the dates to consider.
+        starts (np.ndarray): Start position of each segment, see `segment_cases`.
+
+    Returns:
+        np.ndarray: Per segment, the earliest flagged date, NaT if none.
+    """
+    return _reduce_dates(np.minimum, _NO_EARLIEST, dates, mask, starts)
+
+
+def latest(dates: np.ndarray, mask: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Get the latest flagged date of each segment.
+
+    Args:
+        dates (np.ndarray): datetime64[ns] dates, in segment order.
+        mask (np.ndarray): Flags of the dates to consider.
+        starts (np.ndarray): Start position of each segment, see `segment_cases`.
+
+    Returns:
+        np.ndarray: Per segment, the latest flagged date, NaT if none.
+    """
+    return _reduce_dates(np.maximum, _NO_LATEST, dates, mask, starts)
+
+
+def _reduce_dates(reduction: np.ufunc, empty: int, dates: np.ndarray, mask: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    if not len(starts):
+        return np.empty(0, dtype='datetime64[ns]')
+    values = dates.astype('datetime64[ns]').view(np.int64)
+    # Missing dates are left out as well as unflagged ones
+    reduced = reduction.reduceat(np.where(mask & (values != _NO_LATEST), values, empty), starts)
+    return np.where(reduced == empty, _NO_LATEST, reduced).view('datetime64[ns]')
+
+
+def _days(later: np.ndarray, earlier: np.ndarray) -> np.ndarray:
+    # Whole days, as (later - earlier).dt.days; missing where either date is
+    return (pd.Series(later) - pd.Series(earlier)).dt.days.to_numpy()
+
+
+def case_lifecycle(
+    df: pd.DataFrame,
+    case_column: str = 'case_number',
+    attributes: Optional[List[str]] = None,
+    hearing_column: str = 'hearing',
+) -> pd.DataFrame:
+    """
+    Build one row per case from the activity log, with its timeline and hearings.
+
+    The log is sorted by case and activity date once, see `segment_cases`. Every feature is
+    then a vectorized reduction over the case segments, `np.minimum.reduceat` and
+    `np.add.reduceat` over the sorted columns, so no case is visited in Python.
+
+    Features per case:
+        activities: number of activities.
+        hearings: number of hearings.
+        filed_date: earliest filing date.
+        first_activity, last_activity: first and last activity dates.
+        first_hearing: first hearing on or after the filing date.
+        days_to_first_hearing: days from filing to the first hearing.
+        mean_gap, max_gap: mean and longest number of days between consecutive activities.
+        concluded: whether an activity concluded the case.
+        conclusion_date: date of the first concluding activity.
+        age_at_conclusion: days from filing to conclusion.
+        age_at_last_activity: days from filing to the last activity.
+
+    Args:
+        df (pd.DataFrame): Transformed activities with `case_column`, 'activity_date', 'filed_date' and 'concluded'.
+        case_column (str): The column identifying cases, see `utils.add_case_number`.
+        attributes (Optional[List[str]]): Columns taken from the first activity of each case. Defaults to the
+            CASE_ATTRIBUTES present in `df`.
+        hearing_column (str): Boolean column flagging hearings. If missing, hearings are flagged with the
+            'hearing' rule of `rules.DEFAULT_RULES`, from 'comingfor'.
+
+    Returns:
+        pd.DataFrame: The case table, indexed by case number in sorted order.
+
+    Raises:
+        ValueError: If required columns are missing.
+    """
+    validate_columns(df, [case_column, 'activity_date', 'filed_date', 'concluded'])
+    attributes = [column for column in CASE_ATTRIBUTES if column in df.columns] if attributes is None else attributes
+    validate_columns(df, attributes)
+
+    segments = segment_cases(df, case_column)
+    order, starts = segments.order, segments.starts
+    dates = df['activity_date'].to_numpy(dtype='datetime64[ns]')[order]
+    filed = df['filed_date'].to_numpy(dtype='datetime64[ns]')[order]
+    concluded = df['concluded'].to_numpy(dtype=bool)[order]
+    hearing = df[hearing_column] if hearing_column in df.columns else default_engine().evaluate(df, 'hearing')
+    hearing = np.asarray(hearing, dtype=bool)[order]
+
+    cases = pd.DataFrame(index=segments.case_numbers)
+    for column in attributes:
+        cases[column] = df[column].iloc[order[starts]].array
+
+    sizes = segments.sizes
+    first_activity = dates[starts]
+    last_activity = dates[starts + sizes - 1]
+    filed_date = earliest(filed, np.ones(len(order), dtype=bool), starts)
+    first_hearing = earliest(dates, hearing & (dates >= filed), starts)
+    conclusion_date = earliest(dates, concluded, starts)
+
+    # Days between consecutive activities, zero at the first activity of each case
+    gaps = np.zeros(len(dates), dtype=np.int64)
+    gaps[1:] = np.diff(dates.view(np.int64)) // _DAY
+    gaps[starts] = 0
+
+    cases['activities'] = sizes
+    cases['hearings'] = np.add.reduceat(hearing.astype(np.int64), starts) if len(starts) else np.empty(0, dtype=np.int64)
+    cases['filed_date'] = filed_date
+    cases['first_activity'] = first_activity
+    cases['last_activity'] = last_activity
+    cases['first_hearing'] = first_hearing
+    cases['days_to_first_hearing'] = _days(first_hearing, filed_date)
+    cases['mean_gap'] = np.where(sizes > 1, (last_activity - first_activity) / np.timedelta64(1, 'D') / np.maximum(sizes - 1, 1), np.nan)
+    cases['max_gap'] = np.maximum.reduceat(gaps, starts) if len(starts) else np.empty(0, dtype=np.int64)
+    cases['concluded'] = ~np.isnat(conclusion_date)
+    cases['conclusion_date'] = conclusion_date
+    cases['age_at_conclusion'] = _days(conclusion_date, filed_date)
+    cases['age_at_last_activity'] = _days(last_activity, filed_date)
+
+    logger.info(f"Built case table of {len(cases)} cases from {len(order)} activities")
+    return cases
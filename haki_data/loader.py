@@ -0,0 +1,131 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from . logging_config import logger
+from . utils import apply_schema, month_number, read_partitioned_dataset
+
+DateLike = Union[str, pd.Timestamp]
+
+# Raw columns read by clean_data and transform_data, needed by every analysis
+BASE_COLUMNS: List[str] = [
+    'court_name', 'date_dd', 'date_mon', 'date_yyyy', 'caseid_type', 'caseid_no',
+    'filed_dd', 'filed_mon', 'filed_yyyy', 'case_type', 'comingfor', 'outcome',
+    'next_dd', 'next_mon', 'next_yyyy',
+]
+
+# Raw columns each analysis needs on top of BASE_COLUMNS
+ANALYSIS_COLUMNS: Dict[str, List[str]] = {
+    'court_outcomes': [],
+    'case_time_limits': [],
+    'productivity': [],
+    'monthly_stats': [],
+    'adjournment': ['reason_adj'],
+    'quarterly_stats': ['reason_adj'],
+    'judgment_scheduling': [],
+    'backlog': [],
+}
+
+CSV_CHUNK_SIZE = 500_000
+
+
+def required_columns(analyses: Iterable[str]) -> List[str]:
+    """
+    Get the raw columns needed to clean, transform and run the given analyses.
+
+    Args:
+        analyses (Iterable[str]): Keys of ANALYSIS_COLUMNS.
+
+    Returns:
+        List[str]: The columns to load, in BASE_COLUMNS order followed by the analysis-specific ones.
+
+    Raises:
+        ValueError: If an analysis is not in ANALYSIS_COLUMNS.
+    """
+    unknown = set(analyses) - set(ANALYSIS_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown analyses: {', '.join(sorted(unknown))}")
+    columns = list(BASE_COLUMNS)
+    for analysis in analyses:
+        columns += [column for column in ANALYSIS_COLUMNS[analysis] if column not in columns]
+    return columns
+
+
+def _date_key(df: pd.DataFrame) -> pd.Series:
+    """
+    Encode the activity date parts as YYYYMMDD integers without building datetimes.
+    """
+    year = pd.to_numeric(df['date_yyyy'].astype(object), errors='coerce')
+    day = pd.to_numeric(df['date_dd'].astype(object), errors='coerce')
+    return year * 10000 + month_number(df['date_mon']).astype(float) * 100 + day
+
+
+def filter_rows(df: pd.DataFrame, courts: Optional[Set[str]] = None, start_date: Optional[DateLike] = None, end_date: Optional[DateLike] = None) -> pd.DataFrame:
+    """
+    Keep the rows of the given courts whose activity date falls within the period.
+
+    Args:
+        df (pd.DataFrame): Raw DCRT data with 'court_name' and activity date part columns.
+        courts (Optional[Set[str]]): Raw court names to keep.
+        start_date (Optional[DateLike]): First activity date to keep.
+        end_date (Optional[DateLike]): Last activity date to keep.
+
+    Returns:
+        pd.DataFrame: The matching rows.
+    """
+    mask = pd.Series(True, index=df.index)
+    if courts is not None:
+        mask &= df['court_name'].isin(courts)
+    if start_date is not None or end_date is not None:
+        key = _date_key(df)
+        if start_date is not None:
+            start = pd.Timestamp(start_date)
+            mask &= key >= start.year * 10000 + start.month * 100 + start.day
+        if end_date is not None:
+            end = pd.Timestamp(end_date)
+            mask &= key <= end.year * 10000 + end.month * 100 + end.day
+    return df.take(np.flatnonzero(mask.to_numpy()))
+
+
+def load_court_data(
+    path: str,
+    columns: Optional[List[str]] = None,
+    courts: Optional[Iterable[str]] = None,
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+) -> pd.DataFrame:
+    """
+    Load processed court data, reading only the requested columns and matching rows.
+
+    A partitioned Parquet dataset skips whole court and activity month partitions and reads
+    only the projected columns. A CSV is read in chunks with `usecols`, and each chunk is
+    filtered before the next is read. Rows are then filtered to the exact activity dates.
+
+    Note that `remove_duplicates` in `clean_data` only compares the loaded columns.
+
+    Args:
+        path (str): A CSV file or a partitioned Parquet dataset directory.
+        columns (Optional[List[str]]): Columns to read, e.g. from `required_columns`. Defaults to all.
+        courts (Optional[Iterable[str]]): Raw court names ('court_name' values) to read.
+        start_date (Optional[DateLike]): First activity date to read.
+        end_date (Optional[DateLike]): Last activity date to read.
+
+    Returns:
+        pd.DataFrame: The loaded data, cast to COLUMN_DTYPES.
+    """
+    courts = set(courts) if courts is not None else None
+    if os.path.isdir(path):
+        start_month = pd.Timestamp(start_date).strftime('%Y-%m') if start_date is not None else None
+        end_month = pd.Timestamp(end_date).strftime('%Y-%m') if end_date is not None else None
+        df = read_partitioned_dataset(path, courts=courts, start_month=start_month, end_month=end_month, columns=columns)
+        df = filter_rows(df, None, start_date, end_date)
+    else:
+        chunks = []
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=CSV_CHUNK_SIZE, low_memory=False):
+            chunks.append(apply_schema(filter_rows(chunk, courts, start_date, end_date)))
+        df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+    df = apply_schema(df.reset_index(drop=True))
+    logger.info(f"Loaded {len(df)} rows and {len(df.columns)} columns from {path}")
+    return df
@@ -1,27 +1,58 @@
 import argparse
 import pandas as pd
-from haki_data import preprocessor, analysis, utils
+from haki_data import preprocessor, analysis, utils, loader
+from haki_data.constants import TIME_LIMITS, NON_ADJOURNABLE
+from haki_data.backlog import backlog_snapshots, month_ends
+from haki_data.cube import AggregateCube, CUBE_COLUMNS
+from haki_data.pmmu import pmmu_compliance
+from haki_data.hc_helper import CourtNameResolver
+from haki_data.session import CaseSession
+
+ANALYSES = ['court_outcomes', 'case_time_limits', 'productivity', 'adjournment', 'monthly_stats', 'quarterly_stats', 'judgment_scheduling', 'backlog']
 
 def main():
     parser = argparse.ArgumentParser(description="Court Case Analytics")
-    parser.add_argument("--input", default="/home/stanoo/dcrt/data/API/Hc/hc_23-24_data.csv", help="Input CSV file path")
+    parser.add_argument("--input", default="/home/stanoo/dcrt/data/API/Hc/hc_23-24_data.csv", help="Input CSV file path or partitioned Parquet dataset directory")
     parser.add_argument("--output", default="./output", help="Output directory path")
+    parser.add_argument("--start_date", default="2023-07-01", help="First activity date of the reporting period")
+    parser.add_argument("--end_date", default="2024-06-30", help="Last activity date of the reporting period")
+    parser.add_argument("--courts", nargs="+", help="Only load these courts (raw court names)")
+    parser.add_argument("--court_name_table", help="JSON file caching the raw to canonical court name mapping between runs")
+    parser.add_argument("--backlog_years", type=int, default=5, help="Years of month-end backlog snapshots up to the end date")
     args = parser.parse_args()
+    period_start = pd.Timestamp(args.start_date)
+    period_end = pd.Timestamp(args.end_date)
+
+    # Load only the columns the analyses need, with the whole history up to the end date: cases
+    # pending at a backlog snapshot may have no activity in the reporting period
+    raw_history = loader.load_court_data(
+        args.input,
+        columns=loader.required_columns(ANALYSES),
+        courts=args.courts,
+        end_date=period_end,
+    )
+    raw_df = loader.filter_rows(raw_history, None, period_start, period_end).reset_index(drop=True)
+    resolver = CourtNameResolver(table_path=args.court_name_table)
+    session = CaseSession(raw_df, resolver)
+    history = CaseSession(raw_history, resolver)
+    resolver.save()
+
+    # Aggregate the activities once; the summaries below are answered from the cube
+    df = session.require(*CUBE_COLUMNS)
+    cube = AggregateCube.build(df)
 
-    # Load and process data
-    raw_df = pd.read_csv(args.input)
-    df = preprocessor.clean_data(raw_df)
-    df = preprocessor.transform_data(df)
- 
-    # Perform analysis
-    filed_cases = analysis.analyze_court_outcomes(df, '2023-07-01', '2024-06-30', 'registered')
-    resolved_cases = analysis.analyze_court_outcomes(df, '2023-07-01', '2024-06-30', 'concluded')
-    pmmu_timelines = analysis.process_case_time_limits(df, TIME_LIMITS)
-    court_productivity = analysis.get_productivity(df)
-    adjourned_stats = analysis.get_adjournment(df, NON_ADJOURNABLE)
-    monthly_stats = analysis.get_monthly_case_stats(df, 'registered', 'concluded')
-    #judgment_scheduling = analysis.determine_judgment_scheduling(df)
-    merged_quarterly = get_quarterly_stats(df)
+    # Perform analysis; the remaining ones only compute the derived columns they read
+    filed_cases = analysis.analyze_court_outcomes(df, period_start, period_end, 'registered', cube)
+    resolved_cases = analysis.analyze_court_outcomes(df, period_start, period_end, 'concluded', cube)
+    pmmu_timelines = pmmu_compliance(session.cases(), TIME_LIMITS, 'QE', period_start, period_end)
+    court_productivity = analysis.get_productivity(df, cube)
+    adjourned_stats = analysis.calculate_adjournment_proportion(df, NON_ADJOURNABLE, cube)
+    monthly_stats = analysis.get_monthly_case_stats(df, 'registered', 'concluded', cube)
+    judgment_scheduling = analysis.determine_judgment_scheduling(session.require('case_number', 'activity_date', 'next_date', 'outcome', 'court'), period_end)
+    judgment_delivery = analysis.get_on_time_delivery_proportions(judgment_scheduling)
+    merged_quarterly = analysis.get_quarterly_stats(df, cube)
+    backlog = backlog_snapshots(history.cases(), month_ends(period_end - pd.DateOffset(years=args.backlog_years), period_end))
+    preprocessor.log_stage_report(session.stage_report)
 
     # Save results
     utils.save_results(args.output, {
@@ -32,7 +63,9 @@ def main():
         'pmmu_timelines': pmmu_timelines,
         'court_productivity': court_productivity,
         'adjourned_stats': adjourned_stats,
-        
+        'judgment_scheduling': judgment_scheduling,
+        'judgment_delivery': judgment_delivery,
+        'backlog': backlog,
     })
 
     print(f"Analysis complete. Results saved to {args.output}")
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+from . logging_config import logger
+
+MANIFEST_FILE = 'manifest.json'
+JOURNAL_FILE = 'manifest.journal'
+PARSED_DIR = 'parsed'
+
+
+def file_signature(file_path: str) -> Dict[str, int]:
+    """
+    Get the cheap change-detection signature of a file.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        Dict[str, int]: The file size in bytes and its modification time in nanoseconds.
+    """
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Persistent record of the Excel files already parsed by the DCRT processor.
+
+    Each entry is keyed by the absolute file path and stores the size, modification time
+    and content hash the file had when it was parsed, together with the location of the
+    parsed output. Completed files are appended to a journal as soon as they finish, so an
+    interrupted run resumes from the last completed file. The journal is folded into the
+    manifest snapshot by `save()`.
+
+    Args:
+        state_dir (str): Directory holding the manifest, its journal and the parsed outputs.
+    """
+
+    def __init__(self, state_dir: str) -> None:
+        self.state_dir = state_dir
+        self.manifest_path = os.path.join(state_dir, MANIFEST_FILE)
+        self.journal_path = os.path.join(state_dir, JOURNAL_FILE)
+        self.parsed_dir = os.path.join(state_dir, PARSED_DIR)
+        os.makedirs(self.parsed_dir, exist_ok=True)
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                entries = json.load(f)
+        replayed = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave the final line half written
+                        logger.warning(f"Ignoring truncated journal line in {self.journal_path}")
+                        continue
+                    entries[entry['path']] = entry
+                    replayed += 1
+        logger.info(f"Loaded ingest manifest with {len(entries)} entries ({replayed} replayed from journal)")
+        return entries
+
+    def is_unchanged(self, file_path: str) -> bool:
+        """
+        Check whether a file matches the manifest entry recorded when it was last parsed.
+
+        Size and modification time are compared first. If only the modification time
+        differs the content hash decides, and a matching hash refreshes the stored mtime.
+
+        Args:
+            file_path (str): The path to the Excel file.
+
+        Returns:
+            bool: True if the file is unchanged and its parsed output is still available.
+        """
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if entry is None or not os.path.exists(entry['output']):
+            return False
+
+        signature = file_signature(file_path)
+        if signature['size'] != entry['size']:
+            return False
+        if signature['mtime_ns'] == entry['mtime_ns']:
+            return True
+        if content_hash(file_path) != entry['sha256']:
+            return False
+
+        # Touched but not modified
+        entry['mtime_ns'] = signature['mtime_ns']
+        self._append(entry)
+        return True
+
+    def partition(self, file_paths: List[str]) -> Dict[str, List[str]]:
+        """
+        Split file paths into those that can be served from the manifest and those that need parsing.
+
+        Args:
+            file_paths (List[str]): A list of Excel file paths.
+
+        Returns:
+            Dict[str, List[str]]: The 'unchanged' and 'pending' file paths.
+        """
+        unchanged = [path for path in file_paths if self.is_unchanged(path)]
+        unchanged_set = set(unchanged)
+        pending = [path for path in file_paths if path not in unchanged_set]
+        logger.info(f"Manifest: {len(unchanged)} unchanged files, {len(pending)} files to parse")
+        return {'unchanged': unchanged, 'pending': pending}
+
+    def load_output(self, file_path: str) -> pd.DataFrame:
+        """
+        Load the previously parsed output of a file.
+
+        Args:
+            file_path (str): The path to the Excel file.
+
+        Returns:
+            pd.DataFrame: The DataFrame produced when the file was last parsed.
+        """
+        return pd.read_pickle(self.entries[os.path.abspath(file_path)]['output'])
+
+    def record(self, file_path: str, signature: Dict[str, Any], df: pd.DataFrame) -> None:
+        """
+        Store the parsed output of a file and journal its manifest entry.
+
+        Args:
+            file_path (str): The path to the Excel file.
+            signature (Dict[str, Any]): The file's size, mtime_ns and sha256 taken before it was parsed.
+            df (pd.DataFrame): The parsed DataFrame.
+        """
+        key = os.path.abspath(file_path)
+        output = os.path.join(self.parsed_dir, f"{hashlib.sha1(key.encode()).hexdigest()}.pkl")
+        tmp_output = f"{output}.tmp"
+        df.to_pickle(tmp_output)
+        os.replace(tmp_output, output)
+
+        entry = {'path': key, **signature, 'output': output, 'rows': len(df)}
+        self.entries[key] = entry
+        self._append(entry)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save(self) -> None:
+        """
+        Write the manifest snapshot atomically and truncate the journal.
+        """
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.manifest_path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        logger.info(f"Saved ingest manifest with {len(self.entries)} entries to {self.manifest_path}")
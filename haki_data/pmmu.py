@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Union
+
+from . logging_config import logger
+from . constants import BROAD_CASE_TYPES, TIME_LIMITS
+from . crosstab import factorize_labels
+from . utils import validate_columns
+
+DateLike = Union[str, pd.Timestamp]
+
+
+def validate_time_limits(time_limits: Dict[str, int], categories: Iterable[str] = BROAD_CASE_TYPES) -> Dict[str, int]:
+    """
+    Check that time limits are keyed by known broad case types and are positive numbers of days.
+
+    Args:
+        time_limits (Dict[str, int]): Broad case types mapped to their time limit in days.
+        categories (Iterable[str]): The known broad case types.
+
+    Returns:
+        Dict[str, int]: The time limits.
+
+    Raises:
+        ValueError: If a key is not a known broad case type or a limit is not a positive number of days.
+    """
+    unknown = [category for category in time_limits if category not in set(categories)]
+    if unknown:
+        raise ValueError(f"Time limits for unknown broad case types: {', '.join(map(str, unknown))}")
+    invalid = [category for category, limit in time_limits.items() if not limit > 0]
+    if invalid:
+        raise ValueError(f"Time limits must be positive numbers of days: {', '.join(invalid)}")
+    return time_limits
+
+
+def limit_lookup(labels: pd.Index, time_limits: Dict[str, int]) -> np.ndarray:
+    """
+    Build an array of the time limit of each label, to be indexed by category codes.
+
+    Args:
+        labels (pd.Index): Broad case types, e.g. the categories of the 'broad_case_type' column.
+        time_limits (Dict[str, int]): Broad case types mapped to their time limit in days.
+
+    Returns:
+        np.ndarray: The time limit of each label in days, NaN for labels without one.
+    """
+    return np.array([time_limits.get(label, np.nan) for label in labels], dtype=float)
+
+
+def case_time_limits(categories: pd.Series, time_limits: Dict[str, int]) -> np.ndarray:
+    """
+    Look up the time limit of each row from its broad case type.
+
+    Only the distinct broad case types go through the mapping; rows take their limit from a
+    lookup array indexed by their category code.
+
+    Args:
+        categories (pd.Series): Broad case type of each row.
+        time_limits (Dict[str, int]): Broad case types mapped to their time limit in days.
+
+    Returns:
+        np.ndarray: The time limit of each row in days, NaN where its broad case type has none or is missing.
+    """
+    codes, labels = factorize_labels(categories)
+    lookup = np.append(limit_lookup(labels, time_limits), np.nan)
+    # Code -1, a missing broad case type, picks the trailing NaN
+    return lookup[codes]
+
+
+def _period_ends(days: np.ndarray, freq: str) -> pd.DatetimeIndex:
+    offset = pd.tseries.frequencies.to_offset(freq)
+    first, last = pd.Timestamp(days.min()), pd.Timestamp(days.max())
+    return pd.date_range(offset.rollforward(first), offset.rollforward(last), freq=freq)
+
+
+def _label_column(series: pd.Series, labels: pd.Index, codes: np.ndarray) -> Union[pd.Categorical, pd.Index]:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(codes, dtype=series.dtype)
+    return labels.take(codes)
+
+
+def pmmu_compliance(
+    cases: pd.DataFrame,
+    time_limits: Dict[str, int] = TIME_LIMITS,
+    freq: str = 'QE',
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+    by: str = 'court',
+    period_column: str = 'period',
+) -> pd.DataFrame:
+    """
+    Count cases concluded within and beyond their PMMU time limit per court, broad case type and period.
+
+    A concluded case is on time if its age at conclusion, the days from filing to conclusion,
+    is at most the time limit of its broad case type. Cases are assigned to the period in which
+    they were concluded. Court, broad case type and period are encoded as integer codes and every
+    (court, broad case type, period, on time) count comes out of a single `np.bincount`, so all
+    the reporting periods are counted in one pass over the cases.
+
+    Args:
+        cases (pd.DataFrame): One row per case with `by`, 'broad_case_type', 'conclusion_date' and
+            'age_at_conclusion', see `lifecycle.case_lifecycle`.
+        time_limits (Dict[str, int]): Broad case types mapped to their time limit in days, see `validate_time_limits`.
+        freq (str): Period frequency, e.g. 'ME', 'QE' or 'YE-JUN', see `analysis.aggregate_periods`.
+        start_date (Optional[DateLike]): First conclusion date to count. Defaults to the earliest.
+        end_date (Optional[DateLike]): Last conclusion date to count. Defaults to the latest.
+        by (str): Column to count per value of, e.g. 'court'.
+        period_column (str): Name of the output column holding the last day of each period.
+
+    Returns:
+        pd.DataFrame: One row per `by` value, broad case type and period with concluded cases, holding
+            'time_limit', 'concluded', 'on_time', 'late' and 'proportion_on_time'.
+
+    Raises:
+        ValueError: If required columns are missing or the time limits are invalid.
+    """
+    validate_columns(cases, [by, 'broad_case_type', 'conclusion_date', 'age_at_conclusion'])
+    validate_time_limits(time_limits)
+
+    group_codes, group_labels = factorize_labels(cases[by])
+    type_codes, type_labels = factorize_labels(cases['broad_case_type'])
+    limits = limit_lookup(type_labels, time_limits)
+    days = cases['conclusion_date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    age = cases['age_at_conclusion'].to_numpy(dtype=float)
+
+    keep = (group_codes >= 0) & (type_codes >= 0) & ~np.isnat(days) & ~np.isnan(age)
+    if start_date is not None:
+        keep &= days >= np.datetime64(pd.Timestamp(start_date).date())
+    if end_date is not None:
+        keep &= days <= np.datetime64(pd.Timestamp(end_date).date())
+    rows = np.flatnonzero(keep)
+    limited = ~np.isnan(limits[type_codes[rows]])
+    if not limited.all():
+        logger.info(f"Left {int((~limited).sum())} concluded cases without a time limit out of the PMMU timelines")
+    rows = rows[limited]
+
+    columns = [by, 'broad_case_type', period_column, 'time_limit', 'concluded', 'on_time', 'late', 'proportion_on_time']
+    if not len(rows):
+        return pd.DataFrame(columns=columns)
+
+    # Conclusion dates are whole days, so a case on a period end falls in that period
+    ends = _period_ends(days[rows], freq)
+    period_codes = np.searchsorted(ends.to_numpy().astype('datetime64[D]'), days[rows], side='left')
+    late = age[rows] > limits[type_codes[rows]]
+
+    shape = (len(group_labels), len(type_labels), len(ends), 2)
+    cells = np.ravel_multi_index((group_codes[rows], type_codes[rows], period_codes, late.astype(np.intp)), shape)
+    counts = np.bincount(cells, minlength=np.prod(shape)).reshape(-1, 2)
+    present = np.flatnonzero(counts.sum(axis=1))
+    groups, types, periods = np.unravel_index(present, shape[:3])
+
+    compliance = pd.DataFrame({
+        by: _label_column(cases[by], group_labels, groups),
+        'broad_case_type': _label_column(cases['broad_case_type'], type_labels, types),
+        period_column: ends.take(periods),
+        'time_limit': limits[types].astype(np.int64),
+        'concluded': counts[present].sum(axis=1),
+        'on_time': counts[present, 0],
+        'late': counts[present, 1],
+    })
+    compliance['proportion_on_time'] = compliance['on_time'] / compliance['concluded']
+
+    logger.info(f"Counted PMMU time limit compliance of {len(rows)} concluded cases over {len(ends)} periods")
+    return compliance
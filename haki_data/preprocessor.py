@@ -1,40 +1,129 @@
+import time
 import pandas as pd
 import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from .constants import *
 from .utils import *
 from .cleaner import *
 from .analysis import * 
-from .hc_helper import transform_court_names
-#clean data
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
-    df = transform_court_names(df)
-    df = df.rename(columns={'court_name': 'court'})
-    df['outcome'] = df['outcome'].replace('Terminated/ Struck Out/ Dismissed/Case Closed', 'Terminated')
-    df = drop_nan_columns(df, ['date_dd', 'date_mon', 'date_yyyy', 'caseid_type', 'caseid_no', 'filed_dd', 'filed_mon', 'filed_yyyy', 'case_type', 'comingfor'])
-    df = remove_duplicates(df)
-    df = drop_null_values(df)
-    df = strip_dataframe_columns(df)
-    df = convert_to_title_case(df, 'outcome')
+from .hc_helper import CourtNameResolver, transform_court_names
+from .derived import DERIVED_COLUMNS
+
+Stage = Tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]
+
+# Derived columns added by transform_data after the dates, in computation order
+TRANSFORM_COLUMNS: List[str] = [
+    'case_number', 'case_age', 'nature', 'concluded', 'merit', 'registered', 'productivity_category', 'broad_case_type',
+]
+
+def run_stages(df: pd.DataFrame, stages: List[Stage], stage_report: Optional[List[Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    Run pipeline stages in order under pandas copy-on-write, recording time and memory per stage.
+
+    With copy-on-write, stages that only rename, drop or add columns share the existing column
+    data instead of copying the frame.
+
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+        stages (List[Stage]): (name, function) pairs, each taking and returning a DataFrame.
+        stage_report (Optional[List[Dict[str, Any]]]): List to append one record per stage to, with
+            its 'stage' name, 'seconds', 'rows', the 'frame_bytes' of the result (shallow), the
+            'rss' after the stage, the process 'peak_rss' after it and the 'peak_increase', the
+            growth of the process high-water mark during the stage. The high-water mark only grows
+            when a stage goes past the peak of every earlier stage, so 'peak_increase' is 0 for a
+            stage that stays below it; it is not the peak memory of the stage itself. Memory figures
+            are in bytes and None where the platform does not provide them.
+
+    Returns:
+        pd.DataFrame: The output of the last stage.
+    """
+    with pd.option_context('mode.copy_on_write', True):
+        for name, stage in stages:
+            peak_before = peak_rss()
+            start = time.perf_counter()
+            df = stage(df)
+            record = {
+                'stage': name,
+                'seconds': time.perf_counter() - start,
+                'rows': len(df),
+                'frame_bytes': int(df.memory_usage(index=True, deep=False).sum()),
+                'rss': current_rss(),
+                'peak_rss': peak_rss(),
+            }
+            record['peak_increase'] = record['peak_rss'] - peak_before if peak_before is not None else None
+            if stage_report is not None:
+                stage_report.append(record)
+            if record['rss'] is not None and record['peak_rss'] is not None:
+                logger.debug(f"Stage '{name}': {record['seconds']:.2f}s, frame {record['frame_bytes'] / 1024 ** 2:.1f} MB, "
+                             f"RSS {record['rss'] / 1024 ** 2:.1f} MB, peak {record['peak_rss'] / 1024 ** 2:.1f} MB")
+    return df
+
+def _add_column(column: str, func: Callable[[pd.DataFrame], pd.Series]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    def stage(df: pd.DataFrame) -> pd.DataFrame:
+        df[column] = func(df)
+        return df
+    return stage
 
+def _replace_outcomes(df: pd.DataFrame) -> pd.DataFrame:
+    outcome_map = {'Terminated/ Struck Out/ Dismissed/Case Closed': 'Terminated'}
+    if isinstance(df['outcome'].dtype, pd.CategoricalDtype):
+        df['outcome'] = map_categories(df['outcome'], lambda outcome: outcome_map.get(outcome, outcome))
+    else:
+        df['outcome'] = df['outcome'].replace(outcome_map)
     return df
 
+#clean data
+def clean_data(df: pd.DataFrame, resolver: Optional[CourtNameResolver] = None, stage_report: Optional[List[Dict[str, Any]]] = None) -> pd.DataFrame:
+    stages: List[Stage] = [
+        ('court_names', lambda df: transform_court_names(df, resolver).rename(columns={'court_name': 'court'})),
+        ('outcomes', _replace_outcomes),
+        ('drop_nan', lambda df: drop_nan_columns(df, ['date_dd', 'date_mon', 'date_yyyy', 'caseid_type', 'caseid_no', 'filed_dd', 'filed_mon', 'filed_yyyy', 'case_type', 'comingfor'])),
+        ('duplicates', remove_duplicates),
+        ('null_outcomes', drop_null_values),
+        ('normalize_text', lambda df: normalize_text_columns(df, title_case_columns=['outcome'])),
+    ]
+    return run_stages(df, stages, stage_report)
+
 # transform data
-def transform_data(df: pd.DataFrame) -> pd.DataFrame:
-    
+def transform_data(df: pd.DataFrame, inplace: bool = False, stage_report: Optional[List[Dict[str, Any]]] = None, date_report: Optional[Dict[str, Dict[str, int]]] = None) -> pd.DataFrame:
+    """
+    Add the derived date, case and outcome columns used by the analyses.
+
+    Every stage adds columns to the same frame. Unless `inplace` is set, the input is copied
+    once up front (lazily, under copy-on-write) so the caller's frame is left untouched. The
+    columns are computed from their `derived.DERIVED_COLUMNS` declarations, as in `CaseSession`.
+
+    Args:
+        df (pd.DataFrame): Cleaned data from `clean_data`.
+        inplace (bool): Add the columns to `df` itself.
+        stage_report (Optional[List[Dict[str, Any]]]): List to append per-stage time and memory records to, see `run_stages`.
+        date_report (Optional[Dict[str, Dict[str, int]]]): Dict to store the valid, missing and invalid counts of each date column in.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the derived columns.
+    """
     try:
         validate_columns(df, ['outcome', 'activity_date', 'filed_date'])
         logger.info("Validation passed.")
     except ValueError as e:
         logger.error(e)
-    df = add_date(df.copy(), ['date_dd', 'date_mon', 'date_yyyy'], 'activity_date')
-    df = add_date(df.copy(), ['filed_dd', 'filed_mon', 'filed_yyyy'], 'filed_date')
-    df = add_date(df.copy(), ['next_dd', 'next_mon','next_yyyy'], 'next_date')
-    df = add_case_number(df, 'court', 'caseid_type', 'caseid_no', 'filed_yyyy')
-    df = add_case_age(df)
-    df = add_case_nature(df, CRIMINAL_CASES)
-    df = add_conclusion(df, RESOLVED_OUTCOMES)
-    df = add_registration(df)
-    df = add_productivity(df, MERIT_OUTCOMES)
-    df = add_broad_category(df, 'case_type', 'broad_case_type', BROAD_CASE_TYPES)
-  
-    return df
+    stages: List[Stage] = [('dates', lambda df: add_dates(df, DATE_PARTS, date_report))]
+    stages += [(name, _add_column(name, DERIVED_COLUMNS[name].compute)) for name in TRANSFORM_COLUMNS]
+    if not inplace:
+        stages.insert(0, ('copy', lambda df: df.copy(deep=False)))
+    return run_stages(df, stages, stage_report)
+
+def log_stage_report(stage_report: List[Dict[str, Any]]) -> None:
+    """
+    Log the per-stage time and memory records collected by `run_stages`.
+
+    Args:
+        stage_report (List[Dict[str, Any]]): Records from `run_stages`.
+    """
+    for record in stage_report:
+        message = f"{record['stage']}: {record['seconds']:.2f}s, {record['rows']} rows, frame {record['frame_bytes'] / 1024 ** 2:.1f} MB"
+        if record['rss'] is not None:
+            message += f", RSS {record['rss'] / 1024 ** 2:.1f} MB"
+        if record['peak_increase'] is not None:
+            message += f", peak {record['peak_rss'] / 1024 ** 2:.1f} MB (high-water mark +{record['peak_increase'] / 1024 ** 2:.1f} MB)"
+        logger.info(message)
@@ -0,0 +1,375 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . logging_config import logger
+from . constants import NON_ADJOURNABLE
+from . taxonomy import OUTCOME_FLAGS, map_unique
+
+
+class Expr:
+    """
+    Node of a declarative column rule, evaluated over whole columns at once.
+
+    Rules are built from `col`, `ref` and `when` and combined with `&`, `|` and `~`. Each node
+    has a structural `key`, so identical sub-expressions are evaluated once per `RuleEngine.compute`.
+    """
+
+    key: Tuple[Any, ...]
+
+    def columns(self) -> Set[str]:
+        """
+        Get the DataFrame columns the expression reads.
+        """
+        return set()
+
+    def refs(self) -> Set[str]:
+        """
+        Get the names of the rules the expression refers to.
+        """
+        return set()
+
+    def evaluate(self, df: pd.DataFrame, engine: 'RuleEngine', cache: Dict[Tuple[Any, ...], np.ndarray]) -> np.ndarray:
+        if self.key not in cache:
+            cache[self.key] = self._evaluate(df, engine, cache)
+        return cache[self.key]
+
+    def _evaluate(self, df: pd.DataFrame, engine: 'RuleEngine', cache: Dict[Tuple[Any, ...], np.ndarray]) -> np.ndarray:
+        raise NotImplementedError
+
+    def __and__(self, other: 'Expr') -> 'Expr':
+        return _Combine('and', self, other)
+
+    def __or__(self, other: 'Expr') -> 'Expr':
+        return _Combine('or', self, other)
+
+    def __invert__(self) -> 'Expr':
+        return _Not(self)
+
+    def __repr__(self) -> str:
+        return repr(self.key)
+
+
+class Column:
+    """
+    Reference to a DataFrame column, from which predicates are built.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def contains(self, patterns: Union[str, Iterable[str]], case: bool = False) -> Expr:
+        """
+        True where the text contains any of the substrings. Missing values are False.
+        """
+        return _Contains(self.name, (patterns,) if isinstance(patterns, str) else tuple(patterns), case)
+
+    def isin(self, values: Iterable[Any], case: bool = True) -> Expr:
+        """
+        True where the value is one of `values`, compared case-insensitively unless `case`.
+        """
+        return _IsIn(self.name, tuple(values), case)
+
+    def notna(self) -> Expr:
+        """
+        True where the value is not missing.
+        """
+        return _NotNull(self.name)
+
+    def __eq__(self, other: Any) -> Expr:  # type: ignore[override]
+        return _Equals(self.name, other)
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+
+class _Contains(Expr):
+    def __init__(self, column: str, patterns: Tuple[str, ...], case: bool) -> None:
+        self.column, self.case = column, case
+        self.patterns = patterns if case else tuple(pattern.lower() for pattern in patterns)
+        self.key = ('contains', column, self.patterns, case)
+
+    def columns(self) -> Set[str]:
+        return {self.column}
+
+    def _evaluate(self, df, engine, cache):
+        def matches(value: Any) -> bool:
+            if not isinstance(value, str):
+                return False
+            text = value if self.case else value.lower()
+            return any(pattern in text for pattern in self.patterns)
+        return map_unique(df[self.column], matches, False).to_numpy(dtype=bool)
+
+
+class _IsIn(Expr):
+    def __init__(self, column: str, values: Tuple[Any, ...], case: bool) -> None:
+        self.column, self.case = column, case
+        self.values = frozenset(values if case else (value.lower() if isinstance(value, str) else value for value in values))
+        self.key = ('isin', column, tuple(sorted(map(str, self.values))), case)
+
+    def columns(self) -> Set[str]:
+        return {self.column}
+
+    def _evaluate(self, df, engine, cache):
+        def member(value: Any) -> bool:
+            if not self.case and isinstance(value, str):
+                value = value.lower()
+            return value in self.values
+        return map_unique(df[self.column], member, False).to_numpy(dtype=bool)
+
+
+class _NotNull(Expr):
+    def __init__(self, column: str) -> None:
+        self.column = column
+        self.key = ('notna', column)
+
+    def columns(self) -> Set[str]:
+        return {self.column}
+
+    def _evaluate(self, df, engine, cache):
+        return df[self.column].notna().to_numpy()
+
+
+class _Equals(Expr):
+    def __init__(self, column: str, other: Any) -> None:
+        self.column = column
+        self.other = other.name if isinstance(other, Column) else other
+        self.other_is_column = isinstance(other, Column)
+        self.key = ('eq', column, ('column', self.other) if self.other_is_column else ('value', repr(other)))
+
+    def columns(self) -> Set[str]:
+        return {self.column, self.other} if self.other_is_column else {self.column}
+
+    def _evaluate(self, df, engine, cache):
+        if self.other_is_column:
+            # Missing values on either side never compare equal
+            equal = df[self.column] == df[self.other]
+            if isinstance(equal.dtype, pd.BooleanDtype):
+                equal = equal.fillna(False)
+            return equal.to_numpy(dtype=bool)
+        return map_unique(df[self.column], lambda value: value == self.other, False).to_numpy(dtype=bool)
+
+
+class _Combine(Expr):
+    def __init__(self, op: str, left: Expr, right: Expr) -> None:
+        self.op, self.left, self.right = op, left, right
+        self.key = (op, left.key, right.key)
+
+    def columns(self) -> Set[str]:
+        return self.left.columns() | self.right.columns()
+
+    def refs(self) -> Set[str]:
+        return self.left.refs() | self.right.refs()
+
+    def _evaluate(self, df, engine, cache):
+        left = self.left.evaluate(df, engine, cache)
+        right = self.right.evaluate(df, engine, cache)
+        return left & right if self.op == 'and' else left | right
+
+
+class _Not(Expr):
+    def __init__(self, operand: Expr) -> None:
+        self.operand = operand
+        self.key = ('not', operand.key)
+
+    def columns(self) -> Set[str]:
+        return self.operand.columns()
+
+    def refs(self) -> Set[str]:
+        return self.operand.refs()
+
+    def _evaluate(self, df, engine, cache):
+        return ~self.operand.evaluate(df, engine, cache)
+
+
+class _Ref(Expr):
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.key = ('ref', name)
+
+    def refs(self) -> Set[str]:
+        return {self.name}
+
+    def _evaluate(self, df, engine, cache):
+        return np.asarray(engine.resolve(self.name, df, cache))
+
+
+class _When(Expr):
+    def __init__(self, cases: List[Tuple[Expr, Any]], default: Any) -> None:
+        self.cases, self.default = cases, default
+        self.key = ('when', tuple((condition.key, repr(value)) for condition, value in cases), repr(default))
+
+    def columns(self) -> Set[str]:
+        return set().union(*(condition.columns() for condition, _ in self.cases))
+
+    def refs(self) -> Set[str]:
+        return set().union(*(condition.refs() for condition, _ in self.cases))
+
+    def _evaluate(self, df, engine, cache):
+        conditions = [condition.evaluate(df, engine, cache) for condition, _ in self.cases]
+        values = np.array([value for _, value in self.cases] + [self.default], dtype=object)
+        # np.select cannot take None as a default, so pick the index of the first true condition instead
+        choice = np.select(conditions, np.arange(len(self.cases)), default=len(self.cases))
+        return values[choice]
+
+
+def col(name: str) -> Column:
+    """
+    Refer to a DataFrame column in a rule.
+    """
+    return Column(name)
+
+
+def ref(name: str) -> Expr:
+    """
+    Refer to another rule. An existing DataFrame column of that name is used instead of re-evaluating the rule.
+    """
+    return _Ref(name)
+
+
+def when(cases: List[Tuple[Expr, Any]], default: Any = None) -> Expr:
+    """
+    Pick the value of the first true condition per row, or `default` where none is true.
+    """
+    return _When(cases, default)
+
+
+class RuleEngine:
+    """
+    Set of named column rules computed as whole-column boolean expressions.
+
+    Rules may refer to each other with `ref`. `compute` evaluates the requested rules and
+    the rules they depend on in dependency order, evaluates every distinct sub-expression
+    once, and reuses columns already present in the DataFrame instead of recomputing them.
+
+    Args:
+        rules (Optional[Dict[str, Expr]]): Initial rules by output column name.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Expr]] = None) -> None:
+        self.rules: Dict[str, Expr] = dict(rules or {})
+        self._targets: Set[str] = set()
+
+    def add(self, name: str, expr: Expr) -> 'RuleEngine':
+        """
+        Add or replace a rule.
+
+        Args:
+            name (str): The output column name.
+            expr (Expr): The rule.
+
+        Returns:
+            RuleEngine: The engine, for chaining.
+        """
+        self.rules[name] = expr
+        return self
+
+    def dependencies(self, names: Iterable[str]) -> List[str]:
+        """
+        Order the given rules and the rules they refer to so that each comes after its dependencies.
+
+        Args:
+            names (Iterable[str]): Rule names.
+
+        Returns:
+            List[str]: The rule names in evaluation order.
+
+        Raises:
+            KeyError: If a rule is not defined.
+            ValueError: If the rules refer to each other in a cycle.
+        """
+        order: List[str] = []
+        visiting: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Rules refer to each other in a cycle through '{name}'")
+            if name not in self.rules:
+                raise KeyError(f"No rule named '{name}'")
+            visiting.add(name)
+            for dependency in sorted(self.rules[name].refs()):
+                if dependency in self.rules:
+                    visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def resolve(self, name: str, df: pd.DataFrame, cache: Dict[Tuple[Any, ...], np.ndarray]) -> np.ndarray:
+        """
+        Get the values of a rule, from the DataFrame if it already holds the column.
+        """
+        if name in df.columns and name not in self._targets:
+            return df[name].to_numpy()
+        if name not in self.rules:
+            raise KeyError(f"No rule or column named '{name}'")
+        return self.rules[name].evaluate(df, self, cache)
+
+    def evaluate(self, df: pd.DataFrame, name: str) -> np.ndarray:
+        """
+        Evaluate a rule without adding it to the DataFrame.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to evaluate the rule on.
+            name (str): The rule name.
+
+        Returns:
+            np.ndarray: The rule values, one per row.
+        """
+        return self.compute(df.copy(deep=False), [name])[name].to_numpy()
+
+    def compute(self, df: pd.DataFrame, names: Iterable[str], overwrite: bool = True) -> pd.DataFrame:
+        """
+        Add the given rule columns to the DataFrame.
+
+        Rules they depend on are evaluated as needed but only added as columns when listed.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to add the columns to. Modified in place.
+            names (Iterable[str]): The rules to add as columns.
+            overwrite (bool): Recompute listed rules whose column already exists.
+
+        Returns:
+            pd.DataFrame: The DataFrame with the rule columns added.
+        """
+        names = [name for name in names if overwrite or name not in df.columns]
+        evaluated = [name for name in self.dependencies(names) if name in names or name not in df.columns]
+        missing = set().union(*(self.rules[name].columns() for name in evaluated)) - set(df.columns)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(sorted(missing))}")
+        cache: Dict[Tuple[Any, ...], np.ndarray] = {}
+        self._targets = set(names)
+        try:
+            for name in names:
+                values = self.resolve(name, df, cache)
+                cache[('ref', name)] = values
+                df[name] = values
+                logger.debug(f"Computed rule column '{name}'")
+        finally:
+            self._targets = set()
+        return df
+
+
+DEFAULT_RULES: Dict[str, Expr] = {
+    'concluded': col('outcome').isin(*OUTCOME_FLAGS['concluded']),
+    'merit': col('outcome').isin(*OUTCOME_FLAGS['merit']),
+    'registered': col('outcome').contains(['registered', 'filed']) & (col('activity_date') == col('filed_date')),
+    'adjournable': ~col('comingfor').isin(NON_ADJOURNABLE),
+    'adjourned': col('reason_adj').notna() & ref('adjournable'),
+    'hearing': col('comingfor').contains('hearing'),
+    'productivity_category': when([
+        (ref('merit') & ref('concluded'), 'merit'),
+        (~ref('merit') & ref('concluded'), 'non-merit'),
+    ]),
+}
+
+
+def default_engine() -> RuleEngine:
+    """
+    Get a rule engine holding DEFAULT_RULES.
+    """
+    return RuleEngine(DEFAULT_RULES)
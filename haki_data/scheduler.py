@@ -0,0 +1,271 @@
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple
+
+from . logging_config import logger
+
+# Rough ratio of the memory used to parse a workbook to its size on disk. An .xlsx is a
+# zip of XML, and openpyxl plus the resulting object-dtype DataFrame take a multiple of it.
+DEFAULT_MEMORY_FACTOR = 40.0
+
+# Seconds past the timeout after which the parent kills the workers of an attempt that the
+# worker's own timer could not interrupt, e.g. one stuck in C code
+KILL_GRACE = 5.0
+
+# A task: file path, attempt number and when the attempt was started
+Task = Tuple[str, int, float]
+
+
+def _raise_timeout(signum: int, frame: Any) -> None:
+    raise TimeoutError("file processing timed out")
+
+
+def _run_task(func: Callable[..., Any], file_path: str, args: tuple, timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Run `func(file_path, *args)` in a worker, enforcing the timeout with an interval timer.
+
+    Exceptions are returned as text so that they always survive the trip back to the parent.
+    """
+    use_timer = timeout is not None and hasattr(signal, 'setitimer')
+    if use_timer:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    record: Dict[str, Any] = {'result': None, 'error': None}
+    try:
+        record['result'] = func(file_path, *args)
+    except BaseException as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    record['duration'] = time.perf_counter() - start
+    return record
+
+
+class FileScheduler:
+    """
+    Process pool executor for per-file work with largest-first scheduling.
+
+    Files are ordered by size, largest first, and handed to workers one at a time as workers
+    become free, so a large workbook starts early instead of finishing last. Each attempt is
+    limited by `timeout` and failed files are retried up to `retries` times. The records of
+    the last run are kept for `report()`.
+
+    An attempt whose worker dies (killed, out of memory, crashed in C code) breaks the pool.
+    The files in flight then count a failed attempt and the pool is started again. An attempt
+    still running `KILL_GRACE` seconds past the timeout, which the worker's own timer could not
+    interrupt, has its workers killed and counts as timed out.
+
+    With a `memory_budget`, the memory needed to parse each file is estimated as its size
+    times `memory_factor`, and files are only started while the estimates of the files in
+    flight fit in the budget. When the next largest file does not fit, the largest pending
+    file that does is started instead. One file is always allowed to run, however large.
+
+    Args:
+        processes (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        timeout (Optional[float]): Seconds allowed per attempt. Needs `signal.setitimer`, i.e. a POSIX system.
+        retries (int): Number of times a failed or timed out file is retried.
+        memory_budget (Optional[int]): Bytes of memory the files in flight may use. Defaults to no limit.
+        memory_factor (float): Estimated parse memory per byte of file size.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        memory_budget: Optional[int] = None,
+        memory_factor: float = DEFAULT_MEMORY_FACTOR,
+    ) -> None:
+        self.processes = processes or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        self.memory_budget = memory_budget
+        self.memory_factor = memory_factor
+        self.records: List[Dict[str, Any]] = []
+        self.wall_time = 0.0
+        self.peak_memory = 0
+        if timeout is not None and not hasattr(signal, 'setitimer'):
+            logger.warning("Per-file timeouts are not supported on this platform and will be ignored")
+
+    def order(self, file_paths: List[str]) -> List[str]:
+        """
+        Order file paths by size, largest first. Missing files are placed last.
+
+        Args:
+            file_paths (List[str]): A list of file paths.
+
+        Returns:
+            List[str]: The ordered file paths.
+        """
+        return sorted(file_paths, key=self._size, reverse=True)
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return -1
+
+    def estimate_memory(self, file_path: str) -> int:
+        """
+        Estimate the memory needed to parse a file from its size on disk.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            int: The estimated number of bytes. Missing files are estimated as 0.
+        """
+        return int(max(self._size(file_path), 0) * self.memory_factor)
+
+    def _next_fit(self, pending: List[tuple], in_flight_memory: int) -> Optional[int]:
+        """
+        Find the index of the next pending task to start, or None if none fits the budget.
+
+        `pending` is ordered smallest first, so the search runs from its end.
+        """
+        if self.memory_budget is None or in_flight_memory == 0:
+            return len(pending) - 1
+        for i in range(len(pending) - 1, -1, -1):
+            if in_flight_memory + self.estimate_memory(pending[i][0]) <= self.memory_budget:
+                return i
+        return None
+
+    def run(self, func: Callable[..., Any], file_paths: List[str], *args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Run `func(file_path, *args)` for every file and yield one record per file as it completes.
+
+        `func` must be picklable and should raise on failure rather than return a placeholder.
+
+        Args:
+            func (Callable[..., Any]): The per-file function.
+            file_paths (List[str]): A list of file paths.
+            *args (Any): Extra arguments passed to `func` after the file path.
+
+        Yields:
+            Dict[str, Any]: The file 'path', its 'size', the 'result' of `func` (None on failure), the last
+                'error', the 'duration' of the last attempt in seconds and the number of 'attempts'.
+        """
+        self.records = []
+        self.peak_memory = 0
+        start = time.perf_counter()
+        pending = [(path, 1) for path in reversed(self.order(file_paths))]
+        running: Dict[Future, Task] = {}
+        in_flight_memory = 0
+        pool = ProcessPoolExecutor(self.processes)
+
+        try:
+            while pending or running:
+                while pending and len(running) < self.processes:
+                    i = self._next_fit(pending, in_flight_memory)
+                    if i is None:
+                        break
+                    path, attempt = pending.pop(i)
+                    running[pool.submit(_run_task, func, path, args, self.timeout)] = (path, attempt, time.monotonic())
+                    in_flight_memory += self.estimate_memory(path)
+                self.peak_memory = max(self.peak_memory, in_flight_memory)
+
+                done, _ = wait(running, timeout=self._time_left(running), return_when=FIRST_COMPLETED)
+                overdue = self._overdue(running)
+                if overdue:
+                    # The workers cannot be interrupted, so all of them go and the pool is rebuilt
+                    self._kill_workers(pool)
+                    done, _ = wait(running)
+                finished: List[Tuple[Task, Dict[str, Any]]] = []
+                broken = False
+                for future in done:
+                    task = running.pop(future)
+                    in_flight_memory -= self.estimate_memory(task[0])
+                    finished.append((task, self._outcome(future, task, future in overdue)))
+                    broken |= isinstance(future.exception(), BrokenProcessPool)
+                if broken:
+                    # Every attempt still in flight is lost with the pool
+                    for future in wait(running)[0]:
+                        task = running.pop(future)
+                        in_flight_memory -= self.estimate_memory(task[0])
+                        finished.append((task, self._outcome(future, task, False)))
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(self.processes)
+
+                for (path, attempt, _), record in finished:
+                    if record['error'] and attempt <= self.retries:
+                        logger.warning(f"Attempt {attempt} failed for {path}: {record['error']}; retrying")
+                        pending.append((path, attempt + 1))
+                        continue
+                    if record['error']:
+                        logger.error(f"Error processing file {path}: {record['error']}")
+
+                    record.update(path=path, attempts=attempt, size=os.path.getsize(path) if os.path.exists(path) else None)
+                    self.records.append({key: value for key, value in record.items() if key != 'result'})
+                    yield record
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self.wall_time = time.perf_counter() - start
+
+    def _deadline(self) -> Optional[float]:
+        return self.timeout + KILL_GRACE if self.timeout is not None else None
+
+    def _time_left(self, running: Dict[Future, Task]) -> Optional[float]:
+        deadline = self._deadline()
+        if deadline is None:
+            return None
+        now = time.monotonic()
+        return max(0.0, min(started + deadline - now for _, _, started in running.values()))
+
+    def _overdue(self, running: Dict[Future, Task]) -> List[Future]:
+        deadline = self._deadline()
+        if deadline is None:
+            return []
+        now = time.monotonic()
+        return [future for future, (_, _, started) in running.items() if not future.done() and now - started > deadline]
+
+    @staticmethod
+    def _kill_workers(pool: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor has no public way to stop a running task before Python 3.14
+        for process in list(getattr(pool, '_processes', {}).values()):
+            process.kill()
+
+    @staticmethod
+    def _outcome(future: Future, task: Task, timed_out: bool) -> Dict[str, Any]:
+        """
+        Get the record of a finished attempt, turning a dead worker or a kill into an error.
+        """
+        path, _, started = task
+        duration = time.monotonic() - started
+        if timed_out:
+            return {'result': None, 'error': f"TimeoutError: no result after {duration:.1f}s, worker killed", 'duration': duration}
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            return {'result': None, 'error': f"BrokenProcessPool: a worker died while {path} was in flight", 'duration': duration}
+        if error is not None:
+            return {'result': None, 'error': f"{type(error).__name__}: {error}", 'duration': duration}
+        return future.result()
+
+    def report(self, top_n: int = 10) -> Dict[str, Any]:
+        """
+        Summarize the last run.
+
+        Args:
+            top_n (int): Number of slowest files to list.
+
+        Returns:
+            Dict[str, Any]: Counts of files, failures and retried files, the wall time, the peak
+                estimated memory in flight, the `top_n` slowest files and every failure with its error.
+        """
+        failures = [record for record in self.records if record['error']]
+        slowest = sorted(self.records, key=lambda record: record['duration'], reverse=True)[:top_n]
+        return {
+            'files': len(self.records),
+            'failed': len(failures),
+            'retried': sum(1 for record in self.records if record['attempts'] > 1),
+            'wall_time': self.wall_time,
+            'peak_memory': self.peak_memory,
+            'slowest': [{key: record[key] for key in ('path', 'size', 'duration')} for record in slowest],
+            'failures': [{key: record[key] for key in ('path', 'attempts', 'error')} for record in failures],
+        }
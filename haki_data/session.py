@@ -0,0 +1,118 @@
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional
+
+from . logging_config import logger
+from . derived import DERIVED_COLUMNS, DerivedColumn
+from . hc_helper import CourtNameResolver
+from . lifecycle import CASE_ATTRIBUTES, case_lifecycle
+from . preprocessor import clean_data, run_stages
+
+
+class CaseSession:
+    """
+    Cleaned court data whose derived columns are computed on first use.
+
+    The loaded frame is cleaned once with `clean_data`. Derived columns such as
+    'activity_date', 'case_age', 'nature', 'concluded', 'registered', 'productivity_category',
+    'broad_case_type' and the adjournment flags are declared in DERIVED_COLUMNS with the
+    columns they are computed from. Asking for a column computes it and, first, any derived
+    inputs it needs, then keeps it in the frame, so an analysis only pays for the columns it
+    touches and no column is computed twice.
+
+    Args:
+        df (pd.DataFrame): Loaded DCRT data, e.g. from `loader.load_court_data`.
+        resolver (Optional[CourtNameResolver]): Resolver used by `clean_data`.
+        clean (bool): Run `clean_data` on `df`. Pass False for data that is already clean.
+        derived (Optional[Dict[str, DerivedColumn]]): Derived column declarations. Defaults to DERIVED_COLUMNS.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        resolver: Optional[CourtNameResolver] = None,
+        clean: bool = True,
+        derived: Optional[Dict[str, DerivedColumn]] = None,
+    ) -> None:
+        self.derived = DERIVED_COLUMNS if derived is None else derived
+        self.stage_report: List[Dict[str, Any]] = []
+        self.df = clean_data(df, resolver, self.stage_report) if clean else df
+        self._cases: Optional[pd.DataFrame] = None
+
+    def dependencies(self, column: str) -> List[str]:
+        """
+        List the derived columns needed to compute a column, itself included, in computation order.
+
+        Args:
+            column (str): A raw or derived column name.
+
+        Returns:
+            List[str]: The derived columns, dependencies first. Empty for raw columns.
+        """
+        order: List[str] = []
+
+        def visit(name: str, path: List[str]) -> None:
+            if name in path:
+                raise ValueError(f"Derived columns depend on each other in a cycle: {' -> '.join(path + [name])}")
+            if name not in self.derived or name in order:
+                return
+            for dependency in self.derived[name].inputs:
+                visit(dependency, path + [name])
+            order.append(name)
+
+        visit(column, [])
+        return order
+
+    def require(self, *columns: str) -> pd.DataFrame:
+        """
+        Make sure the given columns are in the frame, computing missing derived columns.
+
+        Args:
+            *columns (str): Raw or derived column names.
+
+        Returns:
+            pd.DataFrame: The session frame, holding at least the requested columns.
+
+        Raises:
+            KeyError: If a column is neither in the frame nor a derived column.
+        """
+        for column in columns:
+            for name in self.dependencies(column):
+                if name not in self.df.columns:
+                    self.df = run_stages(self.df, [(name, self._stage(name))], self.stage_report)
+                    logger.info(f"Computed derived column '{name}'")
+            if column not in self.df.columns:
+                raise KeyError(f"'{column}' is neither a loaded nor a derived column")
+        return self.df
+
+    def _stage(self, name: str) -> Callable[[pd.DataFrame], pd.DataFrame]:
+        def stage(df: pd.DataFrame) -> pd.DataFrame:
+            df[name] = self.derived[name].compute(df)
+            return df
+        return stage
+
+    def __getitem__(self, column: str) -> pd.Series:
+        return self.require(column)[column]
+
+    def frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Get the frame with the given columns, or with every derived column computed.
+
+        Args:
+            columns (Optional[List[str]]): Columns to compute first. Defaults to all derived columns.
+
+        Returns:
+            pd.DataFrame: The session frame.
+        """
+        return self.require(*(self.derived if columns is None else columns))
+
+    def cases(self) -> pd.DataFrame:
+        """
+        Get the case table of the session, see `lifecycle.case_lifecycle`, building it on first use.
+
+        Returns:
+            pd.DataFrame: One row per case number.
+        """
+        if self._cases is None:
+            df = self.require('case_number', 'activity_date', 'filed_date', 'concluded', 'hearing', *CASE_ATTRIBUTES)
+            self._cases = case_lifecycle(df)
+        return self._cases
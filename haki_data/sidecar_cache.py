@@ -0,0 +1,144 @@
+import hashlib
+import os
+import pandas as pd
+from typing import List, Optional
+
+from . logging_config import logger
+
+SIDECAR_SUFFIX = '.parquet'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def _to_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make object columns storable in a typed columnar format.
+
+    Object columns mixing strings and numbers (e.g. 'caseid_no') cannot be written as a
+    single Arrow type, so their non-null values are converted to strings.
+    """
+    df = df.copy()
+    for column in df.select_dtypes(include=['object']).columns:
+        values = df[column].dropna()
+        if values.map(type).nunique() > 1:
+            df[column] = df[column].where(df[column].isna(), df[column].astype(str))
+    return df
+
+
+def _from_columnar(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Restore NaN as the missing value of object columns, matching what `pd.read_excel` returns.
+    """
+    object_columns = df.select_dtypes(include=['object']).columns
+    if len(object_columns):
+        df[object_columns] = df[object_columns].fillna(float('nan'))
+    return df
+
+
+class SidecarCache:
+    """
+    Size-capped cache of parsed DCRT workbooks stored as Parquet sidecar files.
+
+    A sidecar is keyed by the workbook's absolute path, size and modification time, so
+    editing or replacing a workbook invalidates its sidecar. Sidecar modification times
+    are bumped on every hit and `evict()` removes the least recently used sidecars until
+    the cache fits in `max_bytes`.
+
+    Args:
+        cache_dir (str): Directory holding the sidecar files.
+        max_bytes (int): Maximum total size of the cache in bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def sidecar_path(self, file_path: str) -> str:
+        """
+        Get the sidecar location for the current version of a workbook.
+
+        Args:
+            file_path (str): The path to the Excel file.
+
+        Returns:
+            str: The path of the Parquet sidecar.
+        """
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + SIDECAR_SUFFIX)
+
+    def get(self, file_path: str) -> Optional[pd.DataFrame]:
+        """
+        Load the cached parse of a workbook.
+
+        Args:
+            file_path (str): The path to the Excel file.
+
+        Returns:
+            Optional[pd.DataFrame]: The cached DataFrame, or None on a cache miss.
+        """
+        path = self.sidecar_path(file_path)
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable sidecar {path}: {e}")
+            self._remove(path)
+            return None
+        logger.debug(f"Sidecar cache hit for {file_path}")
+        return _from_columnar(df)
+
+    def put(self, file_path: str, df: pd.DataFrame) -> None:
+        """
+        Store the parse of a workbook as a sidecar.
+
+        Args:
+            file_path (str): The path to the Excel file.
+            df (pd.DataFrame): The parsed DataFrame, including the derived 'court_name' column.
+        """
+        path = self.sidecar_path(file_path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            _to_columnar(df).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write sidecar for {file_path}: {e}")
+            self._remove(tmp_path)
+
+    def evict(self) -> List[str]:
+        """
+        Remove least recently used sidecars until the cache fits in `max_bytes`.
+
+        Returns:
+            List[str]: The paths of the removed sidecars.
+        """
+        sidecars = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(SIDECAR_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                sidecars.append((stat.st_mtime_ns, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in sidecars)
+        removed: List[str] = []
+        for _, size, path in sorted(sidecars):
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+            removed.append(path)
+
+        if removed:
+            logger.info(f"Evicted {len(removed)} sidecars, cache size now {total_bytes} bytes")
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
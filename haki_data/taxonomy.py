@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from . logging_config import logger
+from . constants import (
+    BROAD_CASE_TYPES,
+    CRIMINAL_CASES,
+    MERIT_CATEGORY,
+    MERIT_OUTCOMES,
+    RESOLVED_OUTCOMES,
+    TRANSFERED_CASES,
+)
+
+Lookup = Union[Mapping[Any, Any], Callable[[Any], Any]]
+
+# The outcome flags: the outcomes each one is set for and whether they are matched case-sensitively.
+# Taxonomy, the default rules and analysis.add_conclusion all flag outcomes from these.
+OUTCOME_FLAGS: Dict[str, Tuple[List[str], bool]] = {
+    'concluded': (RESOLVED_OUTCOMES, False),
+    'merit': (MERIT_OUTCOMES, True),
+    'transferred': (TRANSFERED_CASES, False),
+}
+
+
+def outcome_matcher(outcomes: List[str], case: bool) -> Callable[[Any], bool]:
+    """
+    Build a predicate telling whether an outcome is one of `outcomes`.
+
+    Args:
+        outcomes (List[str]): The outcomes to match.
+        case (bool): Match case-sensitively.
+
+    Returns:
+        Callable[[Any], bool]: The predicate. Missing outcomes never match.
+    """
+    if case:
+        members = frozenset(outcomes)
+        return lambda outcome: isinstance(outcome, str) and outcome in members
+    members = frozenset(outcome.lower() for outcome in outcomes)
+    return lambda outcome: isinstance(outcome, str) and outcome.lower() in members
+
+
+def invert_mapping(mapping: Mapping[str, Union[str, List[str]]]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Invert a category -> members mapping into a member -> categories index.
+
+    Args:
+        mapping (Mapping[str, Union[str, List[str]]]): Categories mapped to a member or a list of members.
+
+    Returns:
+        Tuple[Dict[str, List[str]], Dict[str, List[str]]]: Every member with the categories it is
+            listed under, in mapping order, and the ambiguous members listed under several categories.
+    """
+    index: Dict[str, List[str]] = {}
+    for category, members in mapping.items():
+        for member in [members] if isinstance(members, str) else members:
+            categories = index.setdefault(member, [])
+            if category not in categories:
+                categories.append(category)
+    ambiguous = {member: categories for member, categories in index.items() if len(categories) > 1}
+    return index, ambiguous
+
+
+def map_unique(series: pd.Series, lookup: Lookup, default: Any = None, categorical: bool = False) -> pd.Series:
+    """
+    Map a column through a lookup once per distinct value instead of once per row.
+
+    Args:
+        series (pd.Series): The column to map.
+        lookup (Lookup): A mapping, or a function called with each distinct value.
+        default (Any): Result for values missing from a mapping lookup and for null values.
+        categorical (bool): Return a categorical column instead of an object one.
+
+    Returns:
+        pd.Series: The mapped column, with the index and name of `series`.
+    """
+    codes, uniques = pd.factorize(series)
+    if callable(lookup):
+        mapped = [lookup(value) for value in uniques]
+    else:
+        mapped = [lookup.get(value, default) for value in uniques]
+    # Filled one by one so that list results are not unpacked into a 2-D array
+    labels = np.empty(len(mapped) + 1, dtype=object)
+    labels[:len(mapped)] = mapped
+    # The trailing default is picked up by the -1 code of missing values
+    labels[-1] = default
+    values = labels[codes]
+    if categorical:
+        return pd.Series(pd.Categorical(values), index=series.index, name=series.name)
+    if all(isinstance(value, (bool, np.bool_)) for value in labels):
+        values = values.astype(bool)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+class Taxonomy:
+    """
+    Case type and outcome classifications compiled into constant-time lookups.
+
+    Built once from the lists in `constants`, it maps each distinct case type or outcome
+    of a column once, see `map_unique`. Case types listed under several broad case types
+    and outcomes listed under several merit categories are found at build time, logged,
+    and resolved to their first category; with `strict` they raise instead.
+
+    Args:
+        broad_case_types (Mapping[str, List[str]]): Broad case type -> case types.
+        criminal_cases (Optional[List[str]]): Case types that are criminal. If None, all cases are criminal.
+        resolved_outcomes (List[str]): Outcomes that conclude a case.
+        merit_outcomes (List[str]): Outcomes that conclude a case on its merits.
+        merit_category (Mapping[str, List[str]]): Merit category -> outcomes.
+        transferred_cases (List[str]): Outcomes that transfer a case.
+            Outcomes are matched with the case handling of their OUTCOME_FLAGS entry.
+        strict (bool): Raise on ambiguous entries instead of logging them.
+
+    Raises:
+        ValueError: If `strict` is set and an entry is ambiguous.
+    """
+
+    def __init__(
+        self,
+        broad_case_types: Mapping[str, List[str]] = BROAD_CASE_TYPES,
+        criminal_cases: Optional[List[str]] = CRIMINAL_CASES,
+        resolved_outcomes: List[str] = RESOLVED_OUTCOMES,
+        merit_outcomes: List[str] = MERIT_OUTCOMES,
+        merit_category: Mapping[str, List[str]] = MERIT_CATEGORY,
+        transferred_cases: List[str] = TRANSFERED_CASES,
+        strict: bool = False,
+    ) -> None:
+        case_type_index, ambiguous_case_types = invert_mapping(broad_case_types)
+        outcome_index, ambiguous_outcomes = invert_mapping(merit_category)
+        self.ambiguous: Dict[str, Dict[str, List[str]]] = {}
+        for name, ambiguous in (('broad_case_type', ambiguous_case_types), ('merit_category', ambiguous_outcomes)):
+            if not ambiguous:
+                continue
+            self.ambiguous[name] = ambiguous
+            details = '; '.join(f"'{member}' in {categories}" for member, categories in ambiguous.items())
+            if strict:
+                raise ValueError(f"Ambiguous {name} entries: {details}")
+            logger.warning(f"Ambiguous {name} entries resolved to their first category: {details}")
+
+        self.broad_case_types: Dict[str, str] = {case_type: categories[0] for case_type, categories in case_type_index.items()}
+        self.merit_categories: Dict[str, str] = {outcome: categories[0] for outcome, categories in outcome_index.items()}
+        self.criminal_cases = frozenset(criminal_cases) if criminal_cases is not None else None
+        self.outcome_flags: Dict[str, Callable[[Any], bool]] = {
+            flag: outcome_matcher(outcomes, OUTCOME_FLAGS[flag][1])
+            for flag, outcomes in (('concluded', resolved_outcomes), ('merit', merit_outcomes), ('transferred', transferred_cases))
+        }
+
+    def nature(self, case_types: pd.Series) -> pd.Series:
+        """
+        Classify case types as 'Criminal' or 'Civil'.
+
+        Args:
+            case_types (pd.Series): Case types.
+
+        Returns:
+            pd.Series: Categorical 'Criminal' or 'Civil' per row.
+        """
+        if self.criminal_cases is None:
+            return map_unique(case_types, lambda case_type: 'Criminal', 'Criminal', categorical=True)
+        return map_unique(case_types, lambda case_type: 'Criminal' if case_type in self.criminal_cases else 'Civil', 'Civil', categorical=True)
+
+    def broad_case_type(self, case_types: pd.Series) -> pd.Series:
+        """
+        Map case types to their broad case type.
+
+        Args:
+            case_types (pd.Series): Case types.
+
+        Returns:
+            pd.Series: Categorical broad case types, missing for unlisted case types.
+        """
+        return map_unique(case_types, self.broad_case_types, categorical=True)
+
+    def concluded(self, outcomes: pd.Series) -> pd.Series:
+        """
+        Flag outcomes that conclude a case.
+
+        Args:
+            outcomes (pd.Series): Outcomes.
+
+        Returns:
+            pd.Series: Boolean flags. Missing outcomes are not concluded.
+        """
+        return map_unique(outcomes, self.outcome_flags['concluded'], False)
+
+    def merit(self, outcomes: pd.Series) -> pd.Series:
+        """
+        Flag outcomes that conclude a case on its merits.
+
+        Args:
+            outcomes (pd.Series): Outcomes.
+
+        Returns:
+            pd.Series: Boolean flags.
+        """
+        return map_unique(outcomes, self.outcome_flags['merit'], False)
+
+    def merit_category(self, outcomes: pd.Series) -> pd.Series:
+        """
+        Map outcomes to their merit category.
+
+        Args:
+            outcomes (pd.Series): Outcomes.
+
+        Returns:
+            pd.Series: Categorical merit categories, missing for unlisted outcomes.
+        """
+        return map_unique(outcomes, self.merit_categories, categorical=True)
+
+    def transferred(self, outcomes: pd.Series) -> pd.Series:
+        """
+        Flag outcomes that transfer a case to another court.
+
+        Args:
+            outcomes (pd.Series): Outcomes.
+
+        Returns:
+            pd.Series: Boolean flags.
+        """
+        return map_unique(outcomes, self.outcome_flags['transferred'], False)
+
+
+@lru_cache(maxsize=1)
+def get_taxonomy() -> Taxonomy:
+    """
+    Get the taxonomy compiled from `constants`, building it on first use.
+
+    Returns:
+        Taxonomy: The shared default taxonomy.
+    """
+    return Taxonomy()
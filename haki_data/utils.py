@@ -1,10 +1,19 @@
 import pandas as pd
 import os
+import sys
 from multiprocessing import Pool
 import logging
 import numpy as np
-from typing import Dict, Any, List, Union, Optional
+import pyarrow as pa
+import pyarrow.dataset as ds
+from typing import Dict, Any, List, Tuple, Union, Optional
 from . logging_config import logger
+from . constants import COLUMN_DTYPES, DATE_PARTS, MONTH_NUMBERS
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 def validate_columns(df: pd.DataFrame, required_columns: Union[str, List[str]]) -> None:
     """
@@ -30,57 +39,291 @@ def validate_columns(df: pd.DataFrame, required_columns: Union[str, List[str]])
 
 
 
-def add_date(df: pd.DataFrame, column_names: List[str], new_col: str) -> pd.DataFrame:
+def _format_text(value: Any) -> Any:
+    """
+    Format a spreadsheet cell as text, writing whole floats such as 12.0 as '12'.
+    """
+    if pd.isna(value) or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """
+    Convert a column to text values, formatting each distinct value once and keeping nulls as NaN.
+    """
+    codes, uniques = pd.factorize(series)
+    # The trailing NaN is picked up by the -1 code of missing values
+    labels = np.array([_format_text(value) for value in uniques] + [np.nan], dtype=object)
+    return pd.Series(labels[codes], index=series.index, name=series.name)
+
+
+def _as_small_int(series: pd.Series, dtype: str) -> pd.Series:
+    """
+    Convert a column to a nullable integer dtype, turning unparseable, fractional and out-of-range values into NA.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    numeric = pd.to_numeric(series, errors='coerce')
+    bounds = np.iinfo(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    valid = (numeric == np.floor(numeric)) & numeric.between(bounds.min, bounds.max)
+    coerced = int((series.notna() & ~valid).sum())
+    if coerced:
+        logger.warning(f"Set {coerced} invalid values in '{series.name}' to NA while casting to {dtype}")
+    return numeric.where(valid).astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None) -> pd.DataFrame:
     """
-    Creates a new date column in the DataFrame by concatenating the values of three specified columns.
+    Cast the DataFrame columns to their declared dtypes.
+
+    Columns missing from the DataFrame are skipped and columns already holding their declared
+    dtype are left untouched, so the schema can be re-applied cheaply after concatenation.
 
     Args:
-        df (pd.DataFrame): The DataFrame containing the data.
-        column_names (List[str]): A list of three column names to be concatenated [year, month, day].
-        new_col (str): The import commandsname of the new date column to be created.
+        df (pd.DataFrame): The DataFrame to cast.
+        schema (Optional[Dict[str, str]]): Mapping of column name to dtype. Defaults to COLUMN_DTYPES.
 
     Returns:
-        pd.DataFrame: The DataFrame with the new date column added.
+        pd.DataFrame: The DataFrame with typed columns.
+    """
+    schema = COLUMN_DTYPES if schema is None else schema
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if dtype == 'category':
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                df[column] = _as_text(series).astype('category')
+        elif dtype == 'string':
+            if not isinstance(series.dtype, pd.StringDtype):
+                df[column] = _as_text(series).astype('string')
+        elif series.dtype != dtype:
+            df[column] = _as_small_int(series, dtype)
+    return df
 
-    Raises:
-        ValueError: If the input list doesn't contain exactly three column names or if columns are missing.
+
+def _parse_month(value: Any) -> Any:
+    """
+    Parse a month name, abbreviation or number into the month number.
     """
-    if len(column_names) != 3:
-        raise ValueError("column_names must contain exactly three elements: [year, month, day]")
+    if pd.isna(value):
+        return np.nan
+    text = str(value).strip()
+    try:
+        number = int(float(text))
+    except ValueError:
+        return MONTH_NUMBERS.get(text[:3].lower(), np.nan)
+    return number if 1 <= number <= 12 else np.nan
 
-    year_col, month_col, day_col = column_names
 
-    # Check if all required columns exist in the DataFrame
-    missing_columns = set(column_names) - set(df.columns)
-    if missing_columns:
-        raise ValueError(f"Missing columns in DataFrame: {', '.join(missing_columns)}")
+def month_number(series: pd.Series) -> pd.Series:
+    """
+    Convert a month column to month numbers, parsing each distinct value once.
+
+    Args:
+        series (pd.Series): Month names ('Jan', 'January'), or month numbers.
+
+    Returns:
+        pd.Series: The month numbers as Int8, with NA for values that are not months.
+    """
+    codes, uniques = pd.factorize(series)
+    # The trailing NaN is picked up by the -1 code of missing values
+    numbers = np.array([_parse_month(value) for value in uniques] + [np.nan], dtype=float)
+    return pd.Series(numbers[codes], index=series.index, name=series.name).astype('Int8')
+
+
+# Arrow types of the partition levels of the Parquet dataset. Hive partition values read back
+# as dictionaries of inferred types otherwise, which pandas cannot restore to the stored dtypes
+PARTITION_TYPES: Dict[str, pa.DataType] = {
+    'court_name': pa.string(),
+    'filed_yyyy': pa.int16(),
+    'activity_month': pa.string(),
+}
+
+
+def dataset_partitioning(columns: List[str]) -> ds.Partitioning:
+    """
+    Get the Hive partitioning of the Parquet dataset over the given partition levels, with their PARTITION_TYPES.
+
+    Args:
+        columns (List[str]): The partition columns, outermost first.
+
+    Returns:
+        ds.Partitioning: The partitioning, to write and to read the dataset with.
+    """
+    return ds.partitioning(pa.schema([(column, PARTITION_TYPES[column]) for column in columns]), flavor='hive')
+
+
+def read_partitioned_dataset(path: str, courts: Optional[List[str]] = None, start_month: Optional[str] = None, end_month: Optional[str] = None, filed_years: Optional[List[int]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read the partitioned Parquet dataset written by `dcrt_processor`, touching only the matching partitions.
+
+    Args:
+        path (str): The root directory of the dataset.
+        columns (Optional[List[str]]): Columns to read. Defaults to all.
+        courts (Optional[List[str]]): Raw court names ('court_name' partitions) to read.
+        start_month (Optional[str]): First activity month to read, in YYYY-MM form.
+        end_month (Optional[str]): Last activity month to read, in YYYY-MM form.
+        filed_years (Optional[List[int]]): Filing years to read, for datasets partitioned by filing year.
+
+    Returns:
+        pd.DataFrame: The matching rows, cast to COLUMN_DTYPES.
+    """
+    filters = []
+    if courts is not None:
+        filters.append(('court_name', 'in', list(courts)))
+    if start_month is not None:
+        filters.append(('activity_month', '>=', start_month))
+    if end_month is not None:
+        filters.append(('activity_month', '<=', end_month))
+    if filed_years is not None:
+        filters.append(('filed_yyyy', 'in', [int(year) for year in filed_years]))
+
+    # Filters on partition levels the dataset does not have would fail
+    levels = ds.dataset(path, partitioning='hive').partitioning.schema.names
+    filters = [condition for condition in filters if condition[0] in levels]
 
-    # Create copies to avoid SettingWithCopyWarning
-    df = df.copy()
+    df = pd.read_parquet(path, columns=columns, filters=filters or None, partitioning=dataset_partitioning(levels))
+    logger.info(f"Read {len(df)} rows from partitioned dataset {path}")
+    return apply_schema(df)
 
+
+def current_rss() -> Optional[int]:
+    """
+    Get the resident set size of this process from /proc/self/statm.
+
+    Returns:
+        Optional[int]: The RSS in bytes, or None where /proc is not available.
+    """
     try:
-        # Convert year and day columns to integers
-        df[year_col] = df[year_col].astype(float).astype(int)
-        df[day_col] = df[day_col].astype(float).astype(int)
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
 
-        # Concatenate the columns to create a date string
-        df[new_col] = (df[year_col].astype(str) + '-' + 
-                       df[month_col].astype(str) + '-' + 
-                       df[day_col].astype(str))
+def peak_rss() -> Optional[int]:
+    """
+    Get the peak resident set size of this process since it started.
 
-        # Convert to datetime
-        df[new_col] = pd.to_datetime(df[new_col], errors='coerce')
+    Returns:
+        Optional[int]: The peak RSS in bytes, or None where `resource` is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _as_float(series: pd.Series) -> np.ndarray:
+    """
+    Convert a column of numbers to a float array with NaN for missing and unparseable values.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
 
-        # Log information about the conversion
-        valid_dates = df[new_col].notna().sum()
-        logger.info(f"Created new date column '{new_col}'. Valid dates: {valid_dates}/{len(df)}")
 
-    except Exception as e:
-        logger.error(f"Error creating date column: {str(e)}")
-        raise
+def assemble_dates(year: pd.Series, month: pd.Series, day: pd.Series) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Build dates from year, month and day columns, converting each distinct (year, month, day) once.
+
+    Months are parsed with `month_number`. The parts are packed into a single YYYYMMDD key,
+    the distinct keys are converted with `pd.to_datetime` and the dates are mapped back to the
+    rows through the factorized key. The counts are taken from the distinct keys as well.
+
+    Args:
+        year (pd.Series): Years.
+        month (pd.Series): Month names ('Jan', 'January') or numbers.
+        day (pd.Series): Days of the month.
+
+    Returns:
+        Tuple[pd.Series, Dict[str, int]]: The dates (NaT where missing or invalid) and the number
+            of 'valid' dates, of rows 'missing' a part and of rows whose parts are not a valid date.
+    """
+    years = _as_float(year)
+    months = month_number(month).to_numpy(dtype=float, na_value=np.nan)
+    days = _as_float(day)
+    key = years * 10000 + months * 100 + days
+    # Fractional parts, or months and days out of range, would otherwise pack into a misleading
+    # key: day 105 of January would read as February 5th
+    out_of_range = (years % 1 != 0) | (days % 1 != 0) | (months < 1) | (months > 12) | (days < 1) | (days > 31)
+    key[out_of_range & ~np.isnan(key)] = -1
+
+    codes, uniques = pd.factorize(key)
+    parts = np.where(uniques < 0, 0, uniques).astype(np.int64)
+    unique_dates = pd.to_datetime(
+        pd.DataFrame({'year': parts // 10000, 'month': parts // 100 % 100, 'day': parts % 100}),
+        errors='coerce',
+    ).to_numpy()
+    # The trailing NaT is picked up by the -1 code of rows missing a part
+    dates = np.append(unique_dates, np.datetime64('NaT', 'ns'))[codes]
+
+    counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+    valid = int(counts[1:][~np.isnat(unique_dates)].sum())
+    missing = int(counts[0])
+    summary = {'valid': valid, 'missing': missing, 'invalid': len(key) - valid - missing}
+    return pd.Series(dates, index=year.index), summary
+
+
+def add_dates(df: pd.DataFrame, date_parts: Optional[Dict[str, List[str]]] = None, date_report: Optional[Dict[str, Dict[str, int]]] = None) -> pd.DataFrame:
+    """
+    Add date columns built from their year, month and day part columns, see `assemble_dates`.
 
+    Args:
+        df (pd.DataFrame): The DataFrame containing the part columns. Modified in place.
+        date_parts (Optional[Dict[str, List[str]]]): Mapping of new column name to its
+            [year, month, day] part columns. Defaults to DATE_PARTS.
+        date_report (Optional[Dict[str, Dict[str, int]]]): Dict to store the counts of each new column in.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the date columns added.
+
+    Raises:
+        ValueError: If a mapping does not name exactly three columns or if columns are missing.
+    """
+    date_parts = DATE_PARTS if date_parts is None else date_parts
+    for new_col, column_names in date_parts.items():
+        if len(column_names) != 3:
+            raise ValueError("column_names must contain exactly three elements: [year, month, day]")
+        missing_columns = set(column_names) - set(df.columns)
+        if missing_columns:
+            raise ValueError(f"Missing columns in DataFrame: {', '.join(missing_columns)}")
+
+    for new_col, (year_col, month_col, day_col) in date_parts.items():
+        df[new_col], summary = assemble_dates(df[year_col], df[month_col], df[day_col])
+        if date_report is not None:
+            date_report[new_col] = summary
+        logger.info(f"Created new date column '{new_col}'. Valid dates: {summary['valid']}/{len(df)}, "
+                    f"missing parts: {summary['missing']}, invalid dates: {summary['invalid']}")
     return df
 
+
+def add_date(df: pd.DataFrame, column_names: List[str], new_col: str, inplace: bool = False) -> pd.DataFrame:
+    """
+    Creates a new date column in the DataFrame from the values of three specified columns.
+
+    Args:
+        df (pd.DataFrame): The DataFrame containing the data.
+        column_names (List[str]): A list of three column names to be combined [year, month, day].
+        new_col (str): The name of the new date column to be created.
+        inplace (bool): Modify `df` itself instead of a copy.
+
+    Returns:
+        pd.DataFrame: The DataFrame with the new date column added.
+
+    Raises:
+        ValueError: If the input list doesn't contain exactly three column names or if columns are missing.
+    """
+    if not inplace:
+        df = df.copy()
+    return add_dates(df, {new_col: column_names})
+
 def add_case_number(df: pd.DataFrame, court_col: str, caseid_type_col: str, caseid_no_col: str, filed_yyyy_col: str, new_col='case_number') -> pd.DataFrame:
     """
     Generates a case number by concatenating court, caseid_type, caseid_no, and filed_yyyy columns.
@@ -96,9 +339,23 @@ def add_case_number(df: pd.DataFrame, court_col: str, caseid_type_col: str, case
     Returns:
         pd.DataFrame: DataFrame with the new case number column.
     """
-    df[new_col] = df[court_col] + '/' + df[caseid_type_col] + '/' + df[caseid_no_col] + '/' + df[filed_yyyy_col].astype(str)
+    df[new_col] = (df[court_col].astype(str) + '/' + df[caseid_type_col].astype(str) + '/' +
+                   df[caseid_no_col].astype(str) + '/' + df[filed_yyyy_col].astype(str))
     return df
 
 
 
 
+def save_results(output_dir: str, results: Dict[str, pd.DataFrame]) -> None:
+    """
+    Save analysis results as CSV files named after their keys.
+
+    Args:
+        output_dir (str): The directory to write the files to. Created if missing.
+        results (Dict[str, pd.DataFrame]): Mapping of result name to DataFrame.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for name, result in results.items():
+        path = os.path.join(output_dir, f"{name}.csv")
+        result.to_csv(path)
+        logger.info(f"Saved '{name}' to {path}")
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from haki_data.dcrt_processor import PARTITION_COLUMNS, write_partitioned_dataset
+from haki_data.loader import load_court_data
+from haki_data.utils import apply_schema, read_partitioned_dataset
+
+COLUMNS = ['court_name', 'date_dd', 'date_mon', 'date_yyyy', 'caseid_type', 'caseid_no', 'filed_yyyy', 'outcome']
+
+
+def make_processed(rows):
+    return apply_schema(pd.DataFrame(rows, columns=COLUMNS))
+
+
+def sorted_rows(df):
+    return df[COLUMNS].astype(object).sort_values(['court_name', 'caseid_no']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('partition_by', list(PARTITION_COLUMNS))
+def test_partitioned_dataset_round_trip(tmp_path, partition_by):
+    first = make_processed([
+        ['Nakuru', 3, 'Jan', 2023, 'HCCA', 1, 2021, 'Judgment Delivered'],
+        ['Nakuru', 15, 'Feb', 2023, 'HCCA', 2, 2022, 'Adjourned'],
+    ])
+    second = make_processed([
+        ['Kisumu', 28, 'Feb', 2023, 'HCCR', 3, 2021, 'Ruling Delivered'],
+    ])
+    # Successive parts, as the streaming writer adds them
+    write_partitioned_dataset(first, str(tmp_path), partition_by, part=0)
+    write_partitioned_dataset(second, str(tmp_path), partition_by, part=1)
+
+    df = read_partitioned_dataset(str(tmp_path))
+    assert df['filed_yyyy'].dtype == 'Int16'
+    pd.testing.assert_frame_equal(sorted_rows(df), sorted_rows(pd.concat([first, second])))
+
+    courts = read_partitioned_dataset(str(tmp_path), courts=['Kisumu'], filed_years=[2021], start_month='2023-02')
+    assert courts['caseid_no'].tolist() == ['3']
+
+    loaded = load_court_data(str(tmp_path), columns=COLUMNS, start_date='2023-02-01', end_date='2023-02-28')
+    assert sorted(loaded['caseid_no'].tolist()) == ['2', '3']
@@ -0,0 +1,58 @@
+import os
+import signal
+import time
+
+import pytest
+
+from haki_data import scheduler as scheduler_module
+from haki_data.scheduler import FileScheduler
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, 'SIGKILL'), reason="needs POSIX signals")
+
+
+def parse(path):
+    name = os.path.basename(path)
+    if name.startswith('kill'):
+        os.kill(os.getpid(), signal.SIGKILL)
+    if name.startswith('hang'):
+        # Blocking SIGALRM stands in for C code the worker's timer cannot interrupt
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        time.sleep(60)
+    return name
+
+
+def make_files(tmp_path, names):
+    paths = []
+    for size, name in enumerate(names, start=1):
+        path = tmp_path / name
+        path.write_bytes(b'x' * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_killed_worker_fails_its_file_and_the_run_completes(tmp_path):
+    paths = make_files(tmp_path, ['a.xlsx', 'b.xlsx', 'kill.xlsx', 'c.xlsx'])
+    runner = FileScheduler(processes=1, timeout=5, retries=1)
+    records = {os.path.basename(record['path']): record for record in runner.run(parse, paths)}
+
+    assert set(records) == {'a.xlsx', 'b.xlsx', 'kill.xlsx', 'c.xlsx'}
+    killed = records['kill.xlsx']
+    assert killed['result'] is None
+    assert 'BrokenProcessPool' in killed['error']
+    assert killed['attempts'] == 2
+    for name in ('a.xlsx', 'b.xlsx', 'c.xlsx'):
+        assert records[name]['result'] == name
+        assert records[name]['error'] is None
+    assert runner.report()['failed'] == 1
+
+
+def test_uninterruptible_attempt_is_killed_after_the_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler_module, 'KILL_GRACE', 0.5)
+    paths = make_files(tmp_path, ['a.xlsx', 'hang.xlsx'])
+    runner = FileScheduler(processes=2, timeout=1, retries=0)
+    start = time.monotonic()
+    records = {os.path.basename(record['path']): record for record in runner.run(parse, paths)}
+
+    assert time.monotonic() - start < 30
+    assert 'TimeoutError' in records['hang.xlsx']['error']
+    assert records['a.xlsx']['result'] == 'a.xlsx'
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+from haki_data.utils import assemble_dates
+
+
+def test_assemble_dates_rejects_out_of_range_day():
+    dates, summary = assemble_dates(
+        pd.Series([2023, 2023, 2023, None]),
+        pd.Series(['Jan', 'Jan', 'Feb', 'Jan']),
+        pd.Series([5, 105, 0, 5], dtype='Int8'),
+    )
+    assert dates.iloc[0] == pd.Timestamp('2023-01-05')
+    assert dates.iloc[1:].isna().all()
+    assert summary == {'valid': 1, 'missing': 1, 'invalid': 2}
+
+
+def test_assemble_dates_matches_to_datetime():
+    year = pd.Series([2020, 2021, 2023, 2023])
+    month = pd.Series(['Feb', 'February', 'Apr', '12'])
+    day = pd.Series([29, 29, 31, 31])
+    dates, summary = assemble_dates(year, month, day)
+    expected = pd.to_datetime(pd.DataFrame({'year': year, 'month': [2, 2, 4, 12], 'day': day}), errors='coerce')
+    np.testing.assert_array_equal(dates.to_numpy(), expected.to_numpy())
+    assert summary == {'valid': 2, 'missing': 0, 'invalid': 2}